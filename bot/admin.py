@@ -1,8 +1,20 @@
 from django.contrib import admin
 
-from bot.models import TgUser
+from bot.models import TgOutboxMessage, TgUpdate, TgUser
 
 
 @admin.register(TgUser)
 class TgUserAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(TgOutboxMessage)
+class TgOutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'chat_id', 'status', 'attempts', 'created', 'sent_at')
+    list_filter = ('status',)
+
+
+@admin.register(TgUpdate)
+class TgUpdateAdmin(admin.ModelAdmin):
+    list_display = ('update_id', 'chat_id', 'status', 'created', 'handled_at')
+    list_filter = ('status',)
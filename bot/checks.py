@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from goals.checks import is_process_local
+
+
+@register(Tags.caches)
+def check_webhook_state_cache(app_configs, **kwargs) -> list[Error]:
+    cache_alias = settings.BOT_STATE_CACHE
+    if not settings.BOT_WEBHOOK_SECRET:
+        return []
+    if cache_alias in settings.CACHES and not is_process_local(cache_alias):
+        return []
+    return [Error(
+        'Webhook бота включён, а состояние диалогов хранится в памяти процесса: '
+        'оно теряется при перезапуске runbot и не видно другим процессам.',
+        hint='Задайте общий CACHE_URL (redis://, memcached://) и BOT_STATE_CACHE=default.',
+        id='bot.E001',
+    )]
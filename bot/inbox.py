@@ -0,0 +1,38 @@
+from datetime import timedelta
+from typing import Iterable
+
+from django.utils import timezone
+
+from bot.models import TgUpdate
+
+# обработанные обновления хранятся сутки: повторная доставка от Telegram отсеивается по update_id
+RETENTION = timedelta(days=1)
+
+
+def store(update_id: int, chat_id: int, payload: dict) -> None:
+    """Сохраняет обновление; повтор уже сохранённого update_id игнорируется."""
+    TgUpdate.objects.bulk_create(
+        [TgUpdate(update_id=update_id, chat_id=chat_id, payload=payload)], ignore_conflicts=True,
+    )
+
+
+def fetch_pending(limit: int, exclude: Iterable[int] = ()) -> list[TgUpdate]:
+    """Необработанные обновления по порядку update_id, кроме уже взятых в работу."""
+    return list(
+        TgUpdate.objects.filter(status=TgUpdate.Status.pending).exclude(update_id__in=list(exclude))
+        .order_by('update_id').only('update_id', 'payload')[:limit]
+    )
+
+
+def mark_done(update_ids: list[int]) -> None:
+    if update_ids:
+        TgUpdate.objects.filter(update_id__in=update_ids).update(
+            status=TgUpdate.Status.done, handled_at=timezone.now(),
+        )
+
+
+def purge(retention: timedelta = RETENTION) -> int:
+    deleted, _ = TgUpdate.objects.filter(
+        status=TgUpdate.Status.done, handled_at__lt=timezone.now() - retention,
+    ).delete()
+    return deleted
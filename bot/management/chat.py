@@ -1,7 +1,12 @@
+import logging
+
+from django.db import close_old_connections
+
 from bot.management.condition import UnverifiedUserCondition, VerifiedUserCondition, BaseTgUserCondition, NewUserCondition
+from bot.management.identity import get_tg_identities
 from bot.models import TgUser
 from bot.tg.client import TgClient
-from bot.tg.dc import Message
+from bot.tg.dc import Message, UpdateObj
 
 
 class Chat:
@@ -17,15 +22,37 @@ class Chat:
             raise RuntimeError('''Состояния не существует''')
 
     def set_condition(self, tg_client: TgClient) -> None:
+        # привязанные аккаунты берутся из кеша без запросов к базе
+        identities = get_tg_identities()
+        if identity := identities.get(self.message.chat.id):
+            self.__condition = VerifiedUserCondition(
+                tg_client=tg_client, tg_user=identity.to_tg_user(), message=self.message
+            )
+            return
+
         tg_user, created = TgUser.objects.get_or_create(
             telegram_chat_id=self.message.chat.id,
             defaults={
                 'telegram_user_id': self.message.from_.id
             }
         )
+        identities.put(tg_user)
         if created:
             self.__condition = NewUserCondition(tg_client=tg_client, tg_user=tg_user)
-        elif not tg_user.user:
+        elif not tg_user.user_id:
             self.__condition = UnverifiedUserCondition(tg_client=tg_client, tg_user=tg_user)
         else:
             self.__condition = VerifiedUserCondition(tg_client=tg_client, tg_user=tg_user, message=self.message)
+
+
+def handle_update(item: UpdateObj, tg_client: TgClient) -> None:
+    """Обработка одного обновления; общая для long polling и webhook."""
+    close_old_connections()
+    try:
+        logging.info(item.message)
+        chat = Chat(message=item.message)
+        chat.set_condition(tg_client=tg_client)
+        # Запуск исполнения команд, доступных юзеру каждого состояния.
+        chat.condition.run()
+    finally:
+        close_old_connections()
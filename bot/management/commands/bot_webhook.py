@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bot.tg.client import TgClient
+from todolist import settings
+
+
+class Command(BaseCommand):
+    help = 'Регистрирует webhook бота в Telegram или удаляет его (возврат к runbot)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?', help='Публичный адрес, например https://example.com/bot/webhook')
+        parser.add_argument('--delete', action='store_true', help='Удалить webhook')
+        parser.add_argument('--max-connections', type=int, default=40, help='Параллельных соединений от Telegram')
+
+    def handle(self, *args, **options):
+        tg_client = TgClient(token=settings.BOT_TOKEN)
+        if options['delete']:
+            result = tg_client.delete_webhook()
+        else:
+            if not options['url']:
+                raise CommandError('Укажите url или --delete')
+            if not settings.BOT_WEBHOOK_SECRET:
+                raise CommandError('Не задан BOT_WEBHOOK_SECRET')
+            result = tg_client.set_webhook(options['url'], settings.BOT_WEBHOOK_SECRET,
+                                           max_connections=options['max_connections'])
+        if not result.get('ok'):
+            raise CommandError(result.get('description', 'Telegram вернул ошибку'))
+        self.stdout.write(self.style.SUCCESS(result.get('description', 'Готово')))
@@ -0,0 +1,38 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from bot.reminders import DeadlineScheduler
+
+
+class Command(BaseCommand):
+    help = 'Планировщик напоминаний о дедлайнах целей; сообщения уходят через send_outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lead', type=int, default=60, help='За сколько минут до дедлайна напоминать')
+        parser.add_argument('--horizon', type=int, default=6 * 60, help='На сколько минут вперёд держать дедлайны в памяти')
+        parser.add_argument('--tick', type=float, default=15, help='Максимальная пауза между проходами, сек')
+        parser.add_argument('--batch-size', type=int, default=100, help='Напоминаний за одну транзакцию')
+        parser.add_argument('--once', action='store_true', help='Один проход и выход')
+
+    def handle(self, *args, **options):
+        scheduler = DeadlineScheduler(
+            lead=timedelta(minutes=options['lead']),
+            horizon=timedelta(minutes=options['horizon']),
+            batch_size=options['batch_size'],
+        )
+        while True:
+            close_old_connections()
+            sent = scheduler.tick()
+            if sent:
+                self.stdout.write(f'Напоминаний поставлено в очередь: {sent}')
+            if options['once']:
+                break
+            # спим до ближайшего напоминания, но не дольше tick — чтобы подхватывать изменения
+            pause = options['tick']
+            if wakeup := scheduler.next_wakeup():
+                pause = min(pause, max((wakeup - timezone.now()).total_seconds(), 0))
+            time.sleep(pause)
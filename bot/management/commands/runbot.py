@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from bot.management.runtime import BotRuntime, WebhookRuntime
+from bot.tg.client import TgClient
+from todolist import settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает Telegram-бота: long polling и обработчики в потоках, по порядку внутри чата. '
+        'Если задан BOT_WEBHOOK_SECRET, обрабатывает обновления, сохранённые webhook; '
+        'в этом режиме должен работать ровно один процесс runbot'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Потоков-обработчиков (чатов, обрабатываемых одновременно)')
+        parser.add_argument('--max-pending', type=int, default=100, help='Предел принятых, но не обработанных обновлений')
+        parser.add_argument('--poll-timeout', type=int, default=10, help='Таймаут long polling, сек')
+        parser.add_argument('--interval', type=float, default=0.5, help='Пауза, когда новых обновлений webhook нет, сек')
+
+    def handle(self, *args, **options):
+        tg_client = TgClient(token=settings.BOT_TOKEN)
+        kwargs = {'workers': options['workers'], 'max_pending': options['max_pending']}
+        if settings.BOT_WEBHOOK_SECRET:
+            runtime = WebhookRuntime(tg_client=tg_client, interval=options['interval'], **kwargs)
+        else:
+            runtime = BotRuntime(tg_client=tg_client, poll_timeout=options['poll_timeout'], **kwargs)
+        runtime.run()
@@ -0,0 +1,60 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from bot import outbox
+from bot.tg.client import TgClient
+from todolist import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Отправляет исходящие сообщения бота из очереди (outbox)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Сообщений за одну выборку')
+        parser.add_argument('--interval', type=float, default=1, help='Пауза, когда очередь пуста, сек')
+        parser.add_argument('--lease', type=float, default=300, help='На сколько сообщения закрепляются за воркером, сек')
+        parser.add_argument('--max-attempts', type=int, default=10, help='После стольких ошибок сообщение помечается неотправленным')
+        parser.add_argument('--backoff', type=float, default=5, help='Базовая пауза перед повтором, сек')
+        parser.add_argument('--max-backoff', type=float, default=3600, help='Предельная пауза перед повтором, сек')
+        parser.add_argument('--once', action='store_true', help='Разобрать очередь один раз и выйти')
+
+    def handle(self, *args, **options):
+        # у клиента свои повторы с учётом retry_after, здесь — повторы между проходами
+        tg_client = TgClient(token=settings.BOT_TOKEN)
+        try:
+            while True:
+                batch = outbox.claim_batch(options['batch_size'], options['lease'])
+                if batch:
+                    self.send_batch(tg_client, batch, options)
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            tg_client.close()
+
+    def send_batch(self, tg_client: TgClient, batch: list, options: dict) -> None:
+        sent = 0
+        for message in batch:
+            try:
+                response = tg_client.send_message(chat_id=int(message.chat_id), text=message.text)
+            except Exception as e:
+                error = repr(e)
+            else:
+                if response.ok:
+                    # отмечаем сразу: при падении воркера повторно уйдёт не больше одного сообщения
+                    outbox.mark_sent([message.id])
+                    sent += 1
+                    continue
+                error = f'Telegram ответил {response.error_code}: {response.description}'
+                if response.permanent_error:
+                    logger.warning('Сообщение %s в чат %s отброшено: %s', message.id, message.chat_id, error)
+                    outbox.mark_rejected(message, error)
+                    continue
+            logger.warning('Сообщение %s в чат %s не отправлено: %s', message.id, message.chat_id, error)
+            outbox.mark_failed(message, error, options['max_attempts'], options['backoff'], options['max_backoff'])
+        self.stdout.write(f'Отправлено {sent} из {len(batch)}')
@@ -1,8 +1,38 @@
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from django.db.models import Count
+
+from bot.management.state import ConversationState, get_chat_states
 from bot.models import TgUser
 from bot.tg.client import TgClient
 from bot.tg.dc import Message
 from goals.models import Goal, GoalCategory
 
+# предел длины одного сообщения Telegram
+MESSAGE_LIMIT = 4096
+GOALS_PAGE_SIZE = 200
+GOAL_STATUSES = {status.name: status.value for status in Goal.Status if status != Goal.Status.archived}
+GOAL_PRIORITIES = {priority.name: priority.value for priority in Goal.Priority}
+GOALS_HELP = (
+    'Формат: /goals [страница] [статус] [приоритет] [count]\n'
+    f'Статусы: {", ".join(GOAL_STATUSES)}\nПриоритеты: {", ".join(GOAL_PRIORITIES)}'
+)
+
+
+def pack_messages(lines: Iterable[str], limit: int = MESSAGE_LIMIT) -> Iterator[str]:
+    """Склеивает строки в сообщения не длиннее limit; слишком длинная строка обрезается."""
+    chunk, size = [], 0
+    for line in lines:
+        line = line[:limit]
+        if chunk and size + 1 + len(line) > limit:
+            yield '\n'.join(chunk)
+            chunk, size = [], 0
+        size += len(line) + (1 if chunk else 0)
+        chunk.append(line)
+    if chunk:
+        yield '\n'.join(chunk)
+
 
 class BaseTgUserCondition:
     """Базовый класс состояния юзера."""
@@ -45,12 +75,12 @@ class UnverifiedUserCondition(BaseTgUserCondition):
 
 class VerifiedUserCondition(BaseTgUserCondition):
     """Класс верифицированного юзера."""
-    is_create_command: bool = False
-    category_for_create: int | None = None
 
     def __init__(self, tg_user: TgUser, tg_client: TgClient, message: Message):
         super().__init__(tg_user, tg_client)
         self.message = message
+        self.states = get_chat_states()
+        self.state: ConversationState = self.states.get(self.tg_user.telegram_chat_id)
 
     def run(self) -> None:
         if self.message.text.startswith('/'):
@@ -58,22 +88,30 @@ class VerifiedUserCondition(BaseTgUserCondition):
         else:
             self._handle_message()
 
+    def _save_state(self) -> None:
+        self.states.set(self.tg_user.telegram_chat_id, self.state)
+
+    def _reset_state(self) -> None:
+        self.state = ConversationState()
+        self.states.clear(self.tg_user.telegram_chat_id)
+
     def _handle_message(self) -> None:
-        if VerifiedUserCondition.is_create_command is False:
+        if self.state.is_create_command is False:
             self.send_message(
                 text='''Доступные команды:\n/goals — получить список целей\n/create — создать новую цель.'''
             )
-        elif VerifiedUserCondition.is_create_command and not VerifiedUserCondition.category_for_create:
+        elif self.state.is_create_command and not self.state.category_for_create:
             self._handle_create_command(self.message)
         else:
             self.create_goal()
 
     def _handle_command(self) -> None:
-        match self.message.text:
+        command, *args = self.message.text.split()
+        match command:
             case '/start':
                 self._handle_message()
             case '/goals':
-                self._handle_goals_command()
+                self._handle_goals_command(args)
             case '/create':
                 self._handle_choose_cat_command()
             case '/cancel':
@@ -85,22 +123,71 @@ class VerifiedUserCondition(BaseTgUserCondition):
                 )
                 self._handle_message()
 
-    def _handle_goals_command(self) -> None:
-        goals: list[str] = list(
-            Goal.objects.filter(user_id=self.tg_user.user.id)
-            .exclude(status=Goal.Status.archived).values_list('title', flat=True)
+    def _handle_goals_command(self, args: list[str]) -> None:
+        """/goals [страница] [статус] [приоритет] [count], например: /goals 2 in_progress high."""
+        page, only_count = 1, False
+        # цели удалённой доски архивирует фоновая задача (archive_deleted_boards), до неё скрываем их сами
+        goals = Goal.objects.filter(
+            user_id=self.tg_user.user_id, category__board__is_deleted=False,
+        ).exclude(status=Goal.Status.archived)
+        for arg in args:
+            arg = arg.lower()
+            if arg.isdigit() and int(arg) > 0:
+                page = int(arg)
+            elif arg == 'count':
+                only_count = True
+            elif arg in GOAL_STATUSES:
+                goals = goals.filter(status=GOAL_STATUSES[arg])
+            elif arg in GOAL_PRIORITIES:
+                goals = goals.filter(priority=GOAL_PRIORITIES[arg])
+            else:
+                self.send_message(text=GOALS_HELP)
+                return
+
+        if only_count:
+            self._send_goals_count(goals)
+            return
+
+        offset = (page - 1) * GOALS_PAGE_SIZE
+        # строки читаются курсором и сразу упаковываются в сообщения; одна лишняя — признак следующей страницы
+        rows = goals.order_by('id').values_list('title', flat=True)[offset:offset + GOALS_PAGE_SIZE + 1]
+        rows = rows.iterator(chunk_size=GOALS_PAGE_SIZE // 4)
+        sent = 0
+        for text in pack_messages(islice(rows, GOALS_PAGE_SIZE)):
+            self.send_message(text=text)
+            sent += 1
+
+        if not sent:
+            self.send_message(text='Целей пока нет.' if page == 1 else 'На этой странице целей нет.')
+        elif next(rows, None) is not None:
+            filters = ' '.join(arg for arg in args if not arg.isdigit())
+            self.send_message(text=f'Страница {page}. Следующая: /goals {page + 1} {filters}'.rstrip())
+
+    def _send_goals_count(self, goals) -> None:
+        counts = dict(goals.order_by().values_list('status').annotate(count=Count('id')))
+        if not counts:
+            self.send_message(text='Целей пока нет.')
+            return
+        summary = '\n'.join(
+            f'{label}: {counts[value]}' for value, label in Goal.Status.choices if value in counts
         )
+        self.send_message(text=f'Всего целей: {sum(counts.values())}\n{summary}')
 
-        self.send_message(
-            text='\n'.join(goals) if goals else 'Целей пока нет.'
+    def _user_categories(self) -> dict[int, str]:
+        return dict(
+            GoalCategory.objects.filter(user_id=self.tg_user.user_id, is_deleted=False, board__is_deleted=False)
+            .values_list('id', 'title')
         )
 
     def _handle_create_command(self, message: Message):
-        categories_id: list[int] = [
-            cat.id for cat in GoalCategory.objects.filter(user_id=self.tg_user.user.id, is_deleted=False)
-        ]
-        if int(message.text) in categories_id:
-            VerifiedUserCondition.category_for_create = int(message.text)
+        # список уже загружен на шаге выбора категории; заново читаем, только если состояние потеряно
+        categories = self.state.categories
+        if categories is None:
+            categories = self.state.categories = self._user_categories()
+        category_id = int(message.text) if message.text.isdigit() else None
+        if category_id in categories:
+            self.state.category_for_create = category_id
+            self._save_state()
             self.send_message(
                 text='''Введите название цели.'''
             )
@@ -110,30 +197,30 @@ class VerifiedUserCondition(BaseTgUserCondition):
             )
 
     def create_goal(self):
-        goal = Goal.objects.create(user_id=self.tg_user.user.id, category_id=VerifiedUserCondition.category_for_create,
-                                   title=self.message.text)
-        VerifiedUserCondition.is_create_command = False
-        VerifiedUserCondition.category_for_create = None
+        category_id = self.state.category_for_create
+        category_title = (self.state.categories or {}).get(category_id)
+        Goal.objects.create(user_id=self.tg_user.user_id, category_id=category_id, title=self.message.text)
+        if category_title is None:
+            category_title = GoalCategory.objects.get(id=category_id).title
+        self._reset_state()
         self.send_message(
-            text=f'''Создана цель {self.message.text} в категории {GoalCategory.objects.get(id=goal.category_id)}.'''
+            text=f'''Создана цель {self.message.text} в категории {category_title}.'''
         )
 
     def _handle_choose_cat_command(self):
-        categories: list[str] = [
-            f'{cat.id}) {cat.title}'
-            for cat in GoalCategory.objects.filter(user_id=self.tg_user.user.id, is_deleted=False)
-        ]
+        categories = self._user_categories()
         if categories:
-            VerifiedUserCondition.is_create_command = True
-            categories_msg: str = '\n'.join(categories)
+            self.state = ConversationState(is_create_command=True, categories=categories)
+            self._save_state()
+            categories_msg: str = '\n'.join(f'{cat_id}) {title}' for cat_id, title in categories.items())
             self.send_message(
                 text=f'''Выберите категорию:\n{categories_msg}\nДля отмены введите /cancel.'''
-                if categories
-                else 'Необходимо создать категорию.'
             )
+        else:
+            self.send_message(text='Необходимо создать категорию.')
 
     def _handle_cancel_create(self):
-        VerifiedUserCondition.is_create_command = False
+        self._reset_state()
         self.send_message(
             text='''Создание цели отменено.'''
         )
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from bot.models import TgUser
+
+
+@dataclass(frozen=True)
+class TgIdentity:
+    """Минимум данных о привязанном TgUser, нужный для обработки сообщения."""
+    id: int
+    telegram_chat_id: str
+    telegram_user_id: str
+    user_id: int
+
+    @classmethod
+    def from_tg_user(cls, tg_user: TgUser) -> 'TgIdentity':
+        return cls(
+            id=tg_user.id,
+            telegram_chat_id=tg_user.telegram_chat_id,
+            telegram_user_id=tg_user.telegram_user_id,
+            user_id=tg_user.user_id,
+        )
+
+    def to_tg_user(self) -> TgUser:
+        tg_user = TgUser(
+            id=self.id,
+            telegram_chat_id=self.telegram_chat_id,
+            telegram_user_id=self.telegram_user_id,
+            user_id=self.user_id,
+        )
+        tg_user._state.adding = False
+        return tg_user
+
+
+class TgIdentityCache:
+    """
+    telegram_chat_id -> TgIdentity; кешируются только привязанные аккаунты, поэтому привязка
+    через /bot/verify видна боту сразу. Если задан cache_alias, записи хранятся в общем кеше Django
+    и сброс сигналом TgUser из любого процесса (API, команды) виден runbot на следующем сообщении.
+    Без него — LRU с TTL в памяти процесса: изменения из других процессов видны не позже чем через ttl.
+    """
+    key_prefix = 'bot:tg_identity:'
+
+    def __init__(self, ttl: float = 60, max_size: int = 10_000, cache_alias: str | None = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cache = caches[cache_alias] if cache_alias else None
+        self._items: OrderedDict[str, tuple[float, TgIdentity]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chat_id: int | str) -> TgIdentity | None:
+        key = str(chat_id)
+        if self.cache is not None:
+            data = self.cache.get(self.key_prefix + key)
+            return TgIdentity(**data) if data else None
+
+        with self._lock:
+            expires, identity = self._items.get(key, (0, None))
+            if identity is None or expires < time.monotonic():
+                self._items.pop(key, None)
+                return None
+            self._items.move_to_end(key)
+            return identity
+
+    def put(self, tg_user: TgUser) -> None:
+        if tg_user.user_id is None:
+            return
+        identity = TgIdentity.from_tg_user(tg_user)
+        if self.cache is not None:
+            self.cache.set(self.key_prefix + identity.telegram_chat_id, asdict(identity), self.ttl)
+            return
+
+        with self._lock:
+            self._items[identity.telegram_chat_id] = (time.monotonic() + self.ttl, identity)
+            self._items.move_to_end(identity.telegram_chat_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, chat_id: int | str) -> None:
+        key = str(chat_id)
+        if self.cache is not None:
+            # как goals.membership.invalidate: сразу и после коммита, чтобы бот не закешировал
+            # запись, прочитанную до фиксации транзакции
+            self.cache.delete(self.key_prefix + key)
+            transaction.on_commit(lambda: self.cache.delete(self.key_prefix + key))
+        with self._lock:
+            self._items.pop(key, None)
+
+
+_identities: TgIdentityCache | None = None
+
+
+def get_tg_identities() -> TgIdentityCache:
+    global _identities
+    if _identities is None:
+        _identities = TgIdentityCache(cache_alias=settings.BOT_IDENTITY_CACHE or None)
+    return _identities
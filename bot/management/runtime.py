@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+from bot import inbox
+from bot.management.chat import handle_update
+from bot.tg.client import TgClient
+from bot.tg.dc import UpdateObj
+
+logger = logging.getLogger(__name__)
+
+
+class BotRuntime:
+    """
+    Цикл бота на потоках. Сетевой ввод-вывод блокирующий (requests и ORM синхронные):
+    получение обновлений идёт в отдельном потоке, обработчики — в пуле из workers потоков.
+    Event loop asyncio только раскладывает обновления по очередям чатов и ждёт потоки,
+    сам он запросов не делает; одновременно обрабатывается не больше workers чатов.
+    Обновления одного чата обрабатываются строго по порядку, число принятых,
+    но ещё не обработанных обновлений ограничено max_pending.
+
+    Полученные через long polling обновления сначала сохраняются в bot.inbox и только потом
+    подтверждаются Telegram сдвигом offset; обработанным обновление помечается после обработчика.
+    Если процесс упадёт или остановится с полными очередями, необработанное возьмётся из базы
+    после перезапуска.
+    """
+
+    def __init__(self, tg_client: TgClient, workers: int = 8, max_pending: int = 100, poll_timeout: int = 10):
+        self.tg_client = tg_client
+        self.workers = workers
+        self.max_pending = max_pending
+        self.poll_timeout = poll_timeout
+        self.offset = 0
+        self._chat_queues: dict[int, deque[UpdateObj]] = {}
+        self._chat_tasks: dict[int, asyncio.Task] = {}
+        self._in_flight: set[int] = set()
+        self._in_flight_lock = threading.Lock()
+        self._purged_at = 0.0
+
+    def run(self) -> None:
+        asyncio.run(self.main())
+
+    async def main(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._pending = asyncio.Semaphore(self.max_pending)
+        self._poll_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bot-poll')
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bot-worker')
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        logger.info('Бот запущен')
+        poller = asyncio.create_task(self.poll())
+        await self._stopping.wait()
+
+        poller.cancel()
+        await asyncio.gather(poller, return_exceptions=True)
+        # дорабатываем всё, что уже принято; полученное, но не принятое осталось в bot.inbox
+        await asyncio.gather(*self._chat_tasks.values(), return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        if self.offset:
+            await loop.run_in_executor(self._poll_executor, self.confirm_offset)
+        self._poll_executor.shutdown(wait=False)
+        logger.info('Бот остановлен')
+
+    def stop(self) -> None:
+        logger.info('Остановка бота')
+        self._stopping.set()
+
+    async def poll(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                items = await loop.run_in_executor(self._poll_executor, self.fetch)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ошибка получения обновлений')
+                await asyncio.sleep(1)
+                continue
+            for item in items:
+                # обратное давление: не принимаем новые обновления, пока не разгрузимся
+                await self._pending.acquire()
+                self.accept(item)
+                self.dispatch(item)
+
+    def fetch(self) -> list[UpdateObj]:
+        """Необработанные обновления из bot.inbox; если их нет — получает новые и читает снова."""
+        close_old_connections()
+        if time.monotonic() - self._purged_at > 60 * 60:
+            inbox.purge()
+            self._purged_at = time.monotonic()
+        items = self.read_inbox()
+        if not items:
+            self.receive()
+            items = self.read_inbox()
+        return items
+
+    def receive(self) -> None:
+        updates = self.tg_client.get_updates(offset=self.offset, timeout=self.poll_timeout).result
+        for item in updates:
+            inbox.store(item.update_id, item.message.chat.id, item.dict(by_alias=True))
+        # offset подтверждает получение Telegram: сдвигаем его, только когда обновления уже в базе
+        if updates:
+            self.offset = updates[-1].update_id + 1
+
+    def read_inbox(self) -> list[UpdateObj]:
+        with self._in_flight_lock:
+            in_flight = list(self._in_flight)
+        items, broken = [], []
+        for update in inbox.fetch_pending(self.max_pending, exclude=in_flight):
+            try:
+                items.append(UpdateObj.parse_obj(update.payload))
+            except Exception:
+                logger.exception('Не удалось разобрать обновление %s', update.update_id)
+                broken.append(update.update_id)
+        inbox.mark_done(broken)
+        return items
+
+    def accept(self, item: UpdateObj) -> None:
+        with self._in_flight_lock:
+            self._in_flight.add(item.update_id)
+
+    def dispatch(self, item: UpdateObj) -> None:
+        chat_id = item.message.chat.id
+        self._chat_queues.setdefault(chat_id, deque()).append(item)
+        if chat_id not in self._chat_tasks:
+            self._chat_tasks[chat_id] = asyncio.create_task(self.drain_chat(chat_id))
+
+    async def drain_chat(self, chat_id: int) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._chat_queues[chat_id]
+        try:
+            while queue:
+                item = queue.popleft()
+                try:
+                    await loop.run_in_executor(self._executor, self.handle, item)
+                except Exception:
+                    logger.exception('Ошибка обработки обновления %s', item.update_id)
+                finally:
+                    self._pending.release()
+        finally:
+            del self._chat_queues[chat_id]
+            del self._chat_tasks[chat_id]
+
+    def handle(self, item: UpdateObj) -> None:
+        try:
+            handle_update(item, self.tg_client)
+        finally:
+            # ошибочное обновление тоже закрываем, иначе оно блокировало бы очередь чата
+            inbox.mark_done([item.update_id])
+            with self._in_flight_lock:
+                self._in_flight.discard(item.update_id)
+
+    def confirm_offset(self) -> None:
+        try:
+            self.tg_client.get_updates(offset=self.offset, timeout=0)
+        except Exception:
+            logger.exception('Не удалось подтвердить offset %s', self.offset)
+
+
+class WebhookRuntime(BotRuntime):
+    """
+    Обработка обновлений, которые webhook сохранил в bot.inbox, вместо long polling.
+    Запускается в одном процессе: обновления читаются по порядку update_id и раскладываются
+    по тем же очередям чатов, поэтому порядок внутри чата сохраняется.
+    """
+
+    def __init__(self, tg_client: TgClient, interval: float = 0.5, **kwargs):
+        super().__init__(tg_client, **kwargs)
+        self.interval = interval
+
+    def receive(self) -> None:
+        # новые обновления записывает view webhook: остаётся подождать их появления в базе
+        time.sleep(self.interval)
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+@dataclass
+class ConversationState:
+    """Состояние диалога в одном чате."""
+    is_create_command: bool = False
+    category_for_create: int | None = None
+    # категории, показанные на шаге /create: id -> название
+    categories: dict[int, str] | None = None
+
+
+class ChatStateStore:
+    """
+    Состояния диалогов по telegram_chat_id: TTL и LRU в памяти процесса.
+    Если задан cache_alias, состояние пишется и читается через общий кеш Django,
+    чтобы несколько процессов бота видели одно и то же.
+    """
+    key_prefix = 'bot:chat_state:'
+
+    def __init__(self, ttl: float = 60 * 30, max_size: int = 10_000, cache_alias: str | None = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cache = caches[cache_alias] if cache_alias else None
+        self._states: OrderedDict[str, tuple[float, ConversationState]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chat_id: int | str) -> ConversationState:
+        key = str(chat_id)
+        if self.cache is not None:
+            data = self.cache.get(self.key_prefix + key)
+            return ConversationState(**data) if data else ConversationState()
+
+        with self._lock:
+            expires, state = self._states.get(key, (0, None))
+            if state is None or expires < time.monotonic():
+                self._states.pop(key, None)
+                return ConversationState()
+            self._states.move_to_end(key)
+            return state
+
+    def set(self, chat_id: int | str, state: ConversationState) -> None:
+        key = str(chat_id)
+        if self.cache is not None:
+            self.cache.set(self.key_prefix + key, asdict(state), self.ttl)
+            return
+
+        with self._lock:
+            self._states[key] = (time.monotonic() + self.ttl, state)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_size:
+                self._states.popitem(last=False)
+
+    def clear(self, chat_id: int | str) -> None:
+        key = str(chat_id)
+        if self.cache is not None:
+            self.cache.delete(self.key_prefix + key)
+        with self._lock:
+            self._states.pop(key, None)
+
+
+_store: ChatStateStore | None = None
+
+
+def get_chat_states() -> ChatStateStore:
+    global _store
+    if _store is None:
+        _store = ChatStateStore(
+            ttl=settings.BOT_STATE_TTL,
+            cache_alias=settings.BOT_STATE_CACHE or None,
+        )
+    return _store
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:46
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0002_tguser_verification_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TgOutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.CharField(max_length=100, verbose_name='Чат')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Ожидает отправки'), (2, 'Отправлено'), (3, 'Не удалось отправить')], default=1, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток отправки')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Доступно для отправки с')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата создания')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата отправки')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Исходящее сообщение',
+                'verbose_name_plural': 'Исходящие сообщения',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tgoutboxmessage',
+            index=models.Index(condition=models.Q(('status', 1)), fields=['available_at', 'id'], name='tgoutbox_pending_idx'),
+        ),
+    ]
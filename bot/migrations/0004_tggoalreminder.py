@@ -0,0 +1,33 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_goal_updated_index'),
+        ('bot', '0003_tgoutboxmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TgGoalReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateTimeField(verbose_name='Дедлайн')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата отправки')),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='goals.goal', verbose_name='Цель')),
+            ],
+            options={
+                'verbose_name': 'Напоминание о дедлайне',
+                'verbose_name_plural': 'Напоминания о дедлайнах',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tggoalreminder',
+            constraint=models.UniqueConstraint(fields=('goal', 'due_date'), name='tggoalreminder_goal_due_uniq'),
+        ),
+    ]
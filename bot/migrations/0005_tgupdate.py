@@ -0,0 +1,34 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0004_tggoalreminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TgUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('update_id', models.BigIntegerField(unique=True, verbose_name='update_id')),
+                ('chat_id', models.BigIntegerField(verbose_name='Чат')),
+                ('payload', models.JSONField(verbose_name='Обновление')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Ожидает обработки'), (2, 'Обработано')], default=1, verbose_name='Статус')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата получения')),
+                ('handled_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата обработки')),
+            ],
+            options={
+                'verbose_name': 'Входящее обновление',
+                'verbose_name_plural': 'Входящие обновления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tgupdate',
+            index=models.Index(condition=models.Q(('status', 1)), fields=['update_id'], name='tgupdate_pending_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 import os
 from django.db import models
+from django.utils import timezone
 
 from core.models import User
 
@@ -18,3 +19,71 @@ class TgUser(models.Model):
         self.verification_code = self._gen_code()
         self.save(update_fields=('verification_code',))
         return self.verification_code
+
+
+class TgOutboxMessage(models.Model):
+    """Исходящее сообщение бота: пишется в одной транзакции с изменением данных, отправляется воркером."""
+
+    class Status(models.IntegerChoices):
+        pending = 1, 'Ожидает отправки'
+        sent = 2, 'Отправлено'
+        failed = 3, 'Не удалось отправить'
+
+    class Meta:
+        verbose_name = 'Исходящее сообщение'
+        verbose_name_plural = 'Исходящие сообщения'
+        indexes = [
+            models.Index(fields=['available_at', 'id'], condition=models.Q(status=1),
+                         name='tgoutbox_pending_idx'),
+        ]
+
+    chat_id = models.CharField(verbose_name='Чат', max_length=100)
+    text = models.TextField(verbose_name='Текст')
+    status = models.PositiveSmallIntegerField(verbose_name='Статус', choices=Status.choices, default=Status.pending)
+    attempts = models.PositiveSmallIntegerField(verbose_name='Попыток отправки', default=0)
+    # время следующей попытки; пока сообщение отправляется — срок аренды воркера
+    available_at = models.DateTimeField(verbose_name='Доступно для отправки с', default=timezone.now)
+    created = models.DateTimeField(verbose_name='Дата создания', default=timezone.now)
+    sent_at = models.DateTimeField(verbose_name='Дата отправки', null=True, blank=True)
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True, default='')
+
+
+class TgUpdate(models.Model):
+    """
+    Обновление от Telegram: webhook сохраняет его до ответа, long polling — до сдвига offset.
+    Обрабатывается единственным процессом runbot по порядку update_id. update_id уникален — повторная
+    доставка того же обновления не создаёт второй строки.
+    """
+
+    class Status(models.IntegerChoices):
+        pending = 1, 'Ожидает обработки'
+        done = 2, 'Обработано'
+
+    class Meta:
+        verbose_name = 'Входящее обновление'
+        verbose_name_plural = 'Входящие обновления'
+        indexes = [
+            models.Index(fields=['update_id'], condition=models.Q(status=1), name='tgupdate_pending_idx'),
+        ]
+
+    update_id = models.BigIntegerField(verbose_name='update_id', unique=True)
+    chat_id = models.BigIntegerField(verbose_name='Чат')
+    payload = models.JSONField(verbose_name='Обновление')
+    status = models.PositiveSmallIntegerField(verbose_name='Статус', choices=Status.choices, default=Status.pending)
+    created = models.DateTimeField(verbose_name='Дата получения', default=timezone.now)
+    handled_at = models.DateTimeField(verbose_name='Дата обработки', null=True, blank=True)
+
+
+class TgGoalReminder(models.Model):
+    """Отправленное напоминание о дедлайне: по одному на цель и значение due_date."""
+
+    class Meta:
+        verbose_name = 'Напоминание о дедлайне'
+        verbose_name_plural = 'Напоминания о дедлайнах'
+        constraints = [
+            models.UniqueConstraint(fields=['goal', 'due_date'], name='tggoalreminder_goal_due_uniq'),
+        ]
+
+    goal = models.ForeignKey('goals.Goal', on_delete=models.CASCADE, verbose_name='Цель')
+    due_date = models.DateTimeField(verbose_name='Дедлайн')
+    created = models.DateTimeField(verbose_name='Дата отправки', default=timezone.now)
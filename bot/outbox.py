@@ -0,0 +1,58 @@
+import random
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bot.models import TgOutboxMessage
+
+
+def enqueue(chat_id: int | str, text: str) -> TgOutboxMessage:
+    """Ставит сообщение в очередь. Вызывать внутри транзакции, меняющей данные."""
+    return TgOutboxMessage.objects.create(chat_id=str(chat_id), text=text)
+
+
+def claim_batch(size: int, lease: float) -> list[TgOutboxMessage]:
+    """
+    Забирает до size готовых к отправке сообщений и продлевает их available_at на lease секунд.
+    Отправка идёт вне транзакции; если воркер упадёт, сообщения снова станут доступны после аренды.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = TgOutboxMessage.objects.filter(
+            status=TgOutboxMessage.Status.pending, available_at__lte=now
+        ).order_by('available_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        batch = list(pending[:size])
+        if batch:
+            TgOutboxMessage.objects.filter(id__in=[message.id for message in batch]).update(
+                available_at=now + timedelta(seconds=lease)
+            )
+    return batch
+
+
+def mark_sent(message_ids: list[int]) -> None:
+    if message_ids:
+        TgOutboxMessage.objects.filter(id__in=message_ids).update(
+            status=TgOutboxMessage.Status.sent, sent_at=timezone.now(), last_error=''
+        )
+
+
+def mark_rejected(message: TgOutboxMessage, error: str) -> None:
+    """Telegram отказал окончательно: сообщение больше не отправляется."""
+    message.attempts += 1
+    message.last_error = error
+    message.status = TgOutboxMessage.Status.failed
+    message.save(update_fields=('attempts', 'last_error', 'status'))
+
+
+def mark_failed(message: TgOutboxMessage, error: str, max_attempts: int, backoff: float, max_backoff: float) -> None:
+    message.attempts += 1
+    message.last_error = error
+    if message.attempts >= max_attempts:
+        message.status = TgOutboxMessage.Status.failed
+    else:
+        delay = random.uniform(0, min(max_backoff, backoff * 2 ** message.attempts))
+        message.available_at = timezone.now() + timedelta(seconds=delay)
+    message.save(update_fields=('attempts', 'last_error', 'status', 'available_at'))
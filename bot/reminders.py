@@ -0,0 +1,145 @@
+import heapq
+import logging
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from bot.models import TgGoalReminder, TgOutboxMessage, TgUser
+from goals.models import Goal
+
+logger = logging.getLogger(__name__)
+
+INACTIVE_STATUSES = (Goal.Status.done, Goal.Status.archived)
+
+
+class DeadlineScheduler:
+    """
+    Напоминания о дедлайнах для пользователей с привязанным Telegram.
+
+    В памяти — min-heap (время напоминания, id цели, due_date) только для целей с дедлайном
+    в окне до loaded_until. Окно дочитывается диапазонным запросом по индексу goal_active_due_idx,
+    изменения целей внутри окна подхватываются по индексу goal_updated_idx, так что за тик
+    читаются только новые и изменённые строки. Устаревшие записи кучи не удаляются,
+    а пропускаются при извлечении (сверка с self.entries).
+    """
+
+    def __init__(self, lead: timedelta, horizon: timedelta, batch_size: int = 100,
+                 updated_overlap: timedelta = timedelta(seconds=5)):
+        self.lead = lead
+        self.horizon = horizon
+        self.batch_size = batch_size
+        # updated ставится до коммита, поэтому перечитываем небольшой нахлёст
+        self.updated_overlap = updated_overlap
+        self.heap: list[tuple[datetime, int, datetime]] = []
+        self.entries: dict[int, datetime] = {}
+        self.loaded_until: datetime | None = None
+        self.changes_since: datetime | None = None
+
+    def tick(self, now: datetime | None = None) -> int:
+        """Один проход: дочитать окно, подхватить изменения, поставить в outbox наступившие напоминания."""
+        now = now or timezone.now()
+        if self.changes_since is None:
+            self.changes_since = now
+        else:
+            self.load_changes(now)
+        if self.loaded_until is None or self.loaded_until < now + self.lead + self.horizon / 2:
+            self.extend_window(now)
+        return self.send_due(now)
+
+    def next_wakeup(self) -> datetime | None:
+        return self.heap[0][0] if self.heap else None
+
+    @staticmethod
+    def pending_goals():
+        """Незавершённые цели привязанных пользователей, о текущем дедлайне которых ещё не напоминали."""
+        return Goal.objects.exclude(status=Goal.Status.archived).exclude(status=Goal.Status.done).filter(
+            Exists(TgUser.objects.filter(user_id=OuterRef('user_id')))
+        ).exclude(
+            Exists(TgGoalReminder.objects.filter(goal_id=OuterRef('pk'), due_date=OuterRef('due_date')))
+        )
+
+    def extend_window(self, now: datetime) -> None:
+        start = self.loaded_until or now
+        end = now + self.lead + self.horizon
+        goals = self.pending_goals().filter(due_date__gt=start, due_date__lte=end)
+        count = 0
+        for goal_id, due_date in goals.values_list('id', 'due_date').iterator(chunk_size=1000):
+            self.push(goal_id, due_date)
+            count += 1
+        self.loaded_until = end
+        logger.info('Окно напоминаний до %s, добавлено %s', end, count)
+
+    def load_changes(self, now: datetime) -> None:
+        since = self.changes_since - self.updated_overlap
+        changed = Goal.objects.filter(updated__gt=since).order_by('updated').values_list(
+            'id', 'due_date', 'status', 'user_id', 'updated'
+        )
+        rows = changed.iterator(chunk_size=1000)
+        while chunk := list(islice(rows, 1000)):
+            self.apply_changes(chunk, now)
+
+    def apply_changes(self, rows: list[tuple], now: datetime) -> None:
+        linked = set(
+            TgUser.objects.filter(user_id__in={row[3] for row in rows}).values_list('user_id', flat=True)
+        )
+        for goal_id, due_date, status, user_id, updated in rows:
+            in_window = due_date is not None and now < due_date <= self.loaded_until
+            if in_window and status not in INACTIVE_STATUSES and user_id in linked:
+                # уже отправленные напоминания отсеются при перепроверке в enqueue
+                if self.entries.get(goal_id) != due_date:
+                    self.push(goal_id, due_date)
+            else:
+                self.entries.pop(goal_id, None)
+            self.changes_since = max(self.changes_since, updated)
+
+    def push(self, goal_id: int, due_date: datetime) -> None:
+        self.entries[goal_id] = due_date
+        heapq.heappush(self.heap, (due_date - self.lead, goal_id, due_date))
+
+    def send_due(self, now: datetime) -> int:
+        sent = 0
+        while self.heap and self.heap[0][0] <= now:
+            batch = []
+            while self.heap and self.heap[0][0] <= now and len(batch) < self.batch_size:
+                _, goal_id, due_date = heapq.heappop(self.heap)
+                if self.entries.get(goal_id) == due_date:
+                    del self.entries[goal_id]
+                    batch.append((goal_id, due_date))
+            if batch:
+                sent += self.enqueue(batch)
+        return sent
+
+    def enqueue(self, batch: list[tuple[int, datetime]]) -> int:
+        """Пишет напоминания и сообщения outbox одной транзакцией; отправит их send_outbox."""
+        expected = dict(batch)
+        # перепроверяем по базе: цель могла измениться после того, как попала в кучу
+        goals = [
+            goal for goal in self.pending_goals().filter(id__in=expected).values('id', 'title', 'user_id', 'due_date')
+            if goal['due_date'] == expected[goal['id']]
+        ]
+        chats = dict(
+            TgUser.objects.filter(user_id__in={goal['user_id'] for goal in goals})
+            .values_list('user_id', 'telegram_chat_id')
+        )
+        goals = [goal for goal in goals if goal['user_id'] in chats]
+        if not goals:
+            return 0
+
+        with transaction.atomic():
+            TgGoalReminder.objects.bulk_create(
+                [TgGoalReminder(goal_id=goal['id'], due_date=goal['due_date']) for goal in goals],
+                ignore_conflicts=True,
+            )
+            TgOutboxMessage.objects.bulk_create([
+                TgOutboxMessage(
+                    chat_id=chats[goal['user_id']],
+                    text=f'''Напоминание: срок цели «{goal['title']}» — '''
+                         f'''{timezone.localtime(goal['due_date']):%d.%m.%Y %H:%M}.''',
+                )
+                for goal in goals
+            ])
+        logger.info('Поставлено напоминаний: %s', len(goals))
+        return len(goals)
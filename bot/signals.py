@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bot.management.identity import get_tg_identities
+from bot.models import TgUser
+
+
+@receiver([post_save, post_delete], sender=TgUser)
+def invalidate_tg_identity(sender, instance: TgUser, **kwargs):
+    get_tg_identities().invalidate(instance.telegram_chat_id)
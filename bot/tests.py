@@ -1,3 +1,604 @@
-from django.test import TestCase
+import io
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from bot import inbox
+from bot.checks import check_webhook_state_cache
+from bot.management.chat import Chat
+from bot.management.commands.send_outbox import Command as SendOutboxCommand
+from bot.management.condition import GOALS_HELP, MESSAGE_LIMIT, VerifiedUserCondition, pack_messages
+from bot.management.identity import TgIdentity, TgIdentityCache, get_tg_identities
+from bot.management.runtime import BotRuntime, WebhookRuntime
+from bot.management.state import ChatStateStore, ConversationState
+from bot.models import TgGoalReminder, TgOutboxMessage, TgUpdate, TgUser
+from bot.reminders import DeadlineScheduler
+from bot.tg.client import TgClient
+from bot.tg.dc import GetUpdatesResponse, Message
+from bot.tg.ratelimit import RateLimiter, TokenBucket
+from core.models import User
+from goals.models import Board, BoardParticipant, Goal, GoalCategory
+
+MESSAGE = {
+    'message_id': 1, 'id': 1, 'date': 0, 'text': 'ok',
+    'chat': {'id': 42, 'first_name': 'Тест'},
+    'from': {'id': 1, 'is_bot': True, 'first_name': 'Бот', 'username': 'bot'},
+}
+SENT = (200, {'ok': True, 'result': MESSAGE})
+RESET = None  # закрыть соединение, ничего не ответив
+
+
+class FakeTelegram:
+    """Bot API на localhost: отвечает по сценарию, по одному ответу на запрос, и запоминает запросы."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                fake.requests.append((self.path, body.decode()))
+                response = fake.responses.pop(0) if fake.responses else SENT
+                if response is RESET:
+                    self.close_connection = True
+                    return
+                code, payload = response
+                data = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server.server_port}'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def error(code: int, description: str, **parameters) -> tuple:
+    payload = {'ok': False, 'error_code': code, 'description': description}
+    if parameters:
+        payload['parameters'] = parameters
+    return code, payload
+
+
+def make_client(fake: FakeTelegram, **kwargs) -> TgClient:
+    # без ограничения частоты: здесь проверяются повторы, а не паузы ограничителя
+    limiter = RateLimiter(global_rate=10_000, chat_rate=10_000, chat_burst=10_000)
+    return TgClient(token='token', api_url=fake.url, rate_limiter=limiter, **kwargs)
+
+
+@mock.patch('bot.tg.client.time.sleep')
+class TgClientRetryTests(SimpleTestCase):
+    def test_429_waits_retry_after(self, sleep):
+        with FakeTelegram(error(429, 'Too Many Requests', retry_after=3), SENT) as fake:
+            response = make_client(fake).send_message(chat_id=42, text='Привет')
+        self.assertTrue(response.ok)
+        self.assertEqual(len(fake.requests), 2)
+        sleep.assert_called_once_with(3.0)
+
+    def test_5xx_backs_off_until_success(self, sleep):
+        with FakeTelegram(error(502, 'Bad Gateway'), error(503, 'Unavailable'), SENT) as fake:
+            response = make_client(fake, backoff=0.5, max_backoff=30).send_message(chat_id=42, text='Привет')
+        self.assertTrue(response.ok)
+        self.assertEqual(len(fake.requests), 3)
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1, delays)
+
+    def test_5xx_gives_up_after_max_retries(self, sleep):
+        with FakeTelegram(*[error(500, 'Internal')] * 3) as fake:
+            response = make_client(fake, max_retries=2).send_message(chat_id=42, text='Привет')
+        self.assertFalse(response.ok)
+        self.assertFalse(response.permanent_error)
+        self.assertEqual(len(fake.requests), 3)
+
+    def test_connection_reset_is_retried(self, sleep):
+        with FakeTelegram(RESET, SENT) as fake:
+            response = make_client(fake).send_message(chat_id=42, text='Привет')
+        self.assertTrue(response.ok)
+        self.assertEqual(len(fake.requests), 2)
+
+    def test_4xx_is_not_retried(self, sleep):
+        with FakeTelegram(error(400, 'Bad Request: chat not found')) as fake:
+            response = make_client(fake).send_message(chat_id=42, text='Привет')
+        self.assertTrue(response.permanent_error)
+        self.assertEqual(response.error_code, 400)
+        self.assertEqual(len(fake.requests), 1)
+        sleep.assert_not_called()
+
+
+class FakeClock:
+    """Часы для модуля time: sleep только сдвигает время."""
+
+    def __init__(self, now: float):
+        self.now = now
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitTests(SimpleTestCase):
+    def test_token_bucket_spreads_requests_after_burst(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        delays = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 0.1, delta=0.01)
+        self.assertAlmostEqual(delays[3], 0.2, delta=0.01)
+
+    @mock.patch('bot.tg.ratelimit.time.sleep')
+    def test_chat_limit_does_not_delay_other_chats(self, sleep):
+        limiter = RateLimiter(global_rate=100, chat_rate=1, chat_burst=1)
+        limiter.wait(1)
+        limiter.wait(2)
+        sleep.assert_not_called()
+        limiter.wait(1)
+        sleep.assert_called_once()
+        self.assertAlmostEqual(sleep.call_args.args[0], 1, delta=0.01)
+
+    def test_shared_window_is_common_to_processes(self):
+        cache.clear()
+        clock = FakeClock(1000.0)
+        with mock.patch('bot.tg.ratelimit.time', clock):
+            # два процесса: у каждого свой RateLimiter, счётчик секунды — в общем кеше
+            runbot, send_outbox = (RateLimiter(global_rate=2, chat_burst=10, cache_alias='default') for _ in range(2))
+            runbot.wait(1)
+            send_outbox.wait(2)
+            self.assertEqual(clock.sleeps, [])
+            send_outbox.wait(3)
+        self.assertEqual(clock.sleeps, [1.0])
+
+    def test_chat_buckets_are_bounded(self):
+        limiter = RateLimiter(max_chats=2)
+        for chat_id in (1, 2, 3):
+            limiter.wait(chat_id)
+        self.assertEqual(list(limiter._chats), [2, 3])
+
+
+@mock.patch('bot.tg.client.time.sleep')
+class SendOutboxTests(TestCase):
+    options = {'max_attempts': 10, 'backoff': 5, 'max_backoff': 3600}
+
+    def send(self, fake: FakeTelegram, *messages: TgOutboxMessage) -> None:
+        command = SendOutboxCommand(stdout=io.StringIO())
+        command.send_batch(make_client(fake, max_retries=0), list(messages), self.options)
+
+    def test_permanent_errors_are_dropped(self, sleep):
+        not_found = TgOutboxMessage.objects.create(chat_id='1', text='Первое')
+        blocked = TgOutboxMessage.objects.create(chat_id='2', text='Второе')
+        with FakeTelegram(error(400, 'Bad Request: chat not found'),
+                          error(403, 'Forbidden: bot was blocked by the user')) as fake:
+            self.send(fake, not_found, blocked)
+
+        for message in (not_found, blocked):
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), (TgOutboxMessage.Status.failed, 1))
+        self.assertIn('chat not found', not_found.last_error)
+
+    def test_temporary_errors_are_retried_later(self, sleep):
+        message = TgOutboxMessage.objects.create(chat_id='1', text='Текст')
+        with FakeTelegram(error(429, 'Too Many Requests', retry_after=1)) as fake:
+            self.send(fake, message)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (TgOutboxMessage.Status.pending, 1))
+
+        with FakeTelegram(SENT) as fake:
+            self.send(fake, message)
+        message.refresh_from_db()
+        self.assertEqual(message.status, TgOutboxMessage.Status.sent)
+
+
+def update(update_id: int, chat_id: int = 42, text: str = '/goals') -> dict:
+    return {'update_id': update_id, 'message': {**MESSAGE, 'text': text, 'chat': {'id': chat_id, 'first_name': 'Тест'}}}
+
+
+@override_settings(BOT_WEBHOOK_SECRET='secret')
+class WebhookTests(APITestCase):
+    def post(self, data: dict, secret: str = 'secret'):
+        return self.client.post('/bot/webhook', data, format='json', HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret)
+
+    def test_update_is_stored_once(self):
+        self.assertEqual(self.post(update(10)).status_code, 200)
+        self.assertEqual(self.post(update(10)).status_code, 200)
+
+        stored = TgUpdate.objects.get()
+        self.assertEqual((stored.update_id, stored.chat_id, stored.status), (10, 42, TgUpdate.Status.pending))
+        self.assertEqual(stored.payload, update(10))
+
+    def test_wrong_secret_is_rejected(self):
+        self.assertEqual(self.post(update(10), secret='wrong').status_code, 403)
+        self.assertFalse(TgUpdate.objects.exists())
+
+    def test_update_without_message_is_skipped(self):
+        self.assertEqual(self.post({'update_id': 10, 'edited_message': {}}).status_code, 200)
+        self.assertFalse(TgUpdate.objects.exists())
+
+
+class WebhookRuntimeTests(TestCase):
+    def setUp(self):
+        # в TestCase соединение с базой закрывать нельзя: в нём открыта транзакция теста
+        patcher = mock.patch('bot.management.runtime.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.runtime = WebhookRuntime(tg_client=None, interval=0, max_pending=10)
+        for update_id, chat_id in ((3, 1), (1, 1), (2, 2)):
+            inbox.store(update_id, chat_id, update(update_id, chat_id))
+
+    def test_fetch_in_update_order_without_in_flight(self):
+        items = self.runtime.fetch()
+        self.assertEqual([item.update_id for item in items], [1, 2, 3])
+
+        self.runtime.accept(items[0])
+        self.assertEqual([item.update_id for item in self.runtime.fetch()], [2, 3])
+
+    @mock.patch('bot.management.runtime.handle_update', side_effect=[None, RuntimeError])
+    def test_handled_updates_are_done(self, handle_update):
+        first, second, third = self.runtime.fetch()
+        for item in (first, second):
+            self.runtime.accept(item)
+        self.runtime.handle(first)
+        with self.assertRaises(RuntimeError):
+            self.runtime.handle(second)
+
+        # после перезапуска останется только необработанное
+        self.assertEqual([item.update_id for item in WebhookRuntime(tg_client=None, interval=0).fetch()], [3])
+        self.assertEqual(TgUpdate.objects.filter(status=TgUpdate.Status.done).count(), 2)
+
+
+class PollingRuntimeTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('bot.management.runtime.close_old_connections')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tg_client = mock.Mock()
+        self.tg_client.get_updates.return_value = GetUpdatesResponse(ok=True, result=[update(1), update(2, chat_id=7)])
+
+    def test_updates_are_stored_before_offset_moves(self):
+        runtime = BotRuntime(tg_client=self.tg_client)
+        items = runtime.fetch()
+        self.assertEqual([item.update_id for item in items], [1, 2])
+        self.assertEqual(runtime.offset, 3)
+        self.assertEqual(list(TgUpdate.objects.order_by('update_id').values_list('update_id', 'chat_id', 'status')),
+                         [(1, 42, TgUpdate.Status.pending), (2, 7, TgUpdate.Status.pending)])
+
+    @mock.patch('bot.management.runtime.handle_update')
+    def test_unhandled_updates_survive_restart(self, handle_update):
+        runtime = BotRuntime(tg_client=self.tg_client)
+        first, second = runtime.fetch()
+        for item in (first, second):
+            runtime.accept(item)
+        runtime.handle(first)
+
+        # процесс остановился, не обработав второе обновление; Telegram его больше не пришлёт
+        self.tg_client.get_updates.return_value = GetUpdatesResponse(ok=True, result=[])
+        restarted = BotRuntime(tg_client=self.tg_client)
+        self.assertEqual([item.update_id for item in restarted.fetch()], [2])
+        self.tg_client.get_updates.assert_called_once()
+
+
+class WebhookStateCacheCheckTests(SimpleTestCase):
+    @override_settings(BOT_WEBHOOK_SECRET='secret', BOT_STATE_CACHE='')
+    def test_webhook_without_shared_state_fails(self):
+        self.assertEqual([error.id for error in check_webhook_state_cache(None)], ['bot.E001'])
+
+    @override_settings(BOT_WEBHOOK_SECRET='secret', BOT_STATE_CACHE='default', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://redis:6379/0'},
+    })
+    def test_webhook_with_shared_state_passes(self):
+        self.assertEqual(check_webhook_state_cache(None), [])
+
+    @override_settings(BOT_WEBHOOK_SECRET='', BOT_STATE_CACHE='')
+    def test_polling_does_not_need_shared_state(self):
+        self.assertEqual(check_webhook_state_cache(None), [])
+
+
+def message(text: str, chat_id: int = 42) -> Message:
+    return Message(**{**MESSAGE, 'text': text, 'chat': {'id': chat_id, 'first_name': 'Тест'}})
+
+
+class BotUserTestCase(TestCase):
+    """Пользователь с привязанным Telegram и категорией на своей доске."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='Pa55word!')
+        self.board = Board.objects.create(title='Доска')
+        BoardParticipant.objects.create(board=self.board, user=self.user, role=BoardParticipant.Role.owner)
+        self.category = GoalCategory.objects.create(board=self.board, user=self.user, title='Категория')
+        self.tg_user = TgUser.objects.create(telegram_chat_id='42', telegram_user_id='1', user=self.user)
+        self.tg_client = mock.Mock()
+
+    def sent(self) -> list[str]:
+        return [call.kwargs['text'] for call in self.tg_client.send_message.call_args_list]
+
+
+class PackMessagesTests(SimpleTestCase):
+    def test_lines_are_packed_up_to_limit(self):
+        lines = ['a' * 4, 'b' * 4, 'c' * 4]
+        self.assertEqual(list(pack_messages(lines, limit=9)), ['aaaa\nbbbb', 'cccc'])
+        self.assertEqual(list(pack_messages(lines, limit=14)), ['aaaa\nbbbb\ncccc'])
+
+    def test_long_line_is_truncated(self):
+        self.assertEqual(list(pack_messages(['a' * 10, 'b'], limit=4)), ['aaaa', 'b'])
+
+    def test_nothing_is_lost_or_oversized(self):
+        lines = [f'Цель {index} ' + 'x' * (index % 97) for index in range(2000)]
+        messages = list(pack_messages(lines))
+        self.assertTrue(all(len(text) <= MESSAGE_LIMIT for text in messages))
+        self.assertEqual('\n'.join(messages).split('\n'), lines)
+
+    def test_no_lines_no_messages(self):
+        self.assertEqual(list(pack_messages([])), [])
+
+
+class GoalsCommandTests(BotUserTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        # 300 названий по ~60 символов: страница из 200 не помещается в одно сообщение
+        Goal.objects.bulk_create([
+            Goal(category=self.category, board=self.board, user=self.user, title=f'Цель {index:03} ' + 'x' * 50,
+                 status=Goal.Status.done if index % 5 == 0 else Goal.Status.to_do,
+                 priority=Goal.Priority.high if index % 2 else Goal.Priority.low, created=now, updated=now)
+            for index in range(300)
+        ])
+        Goal.objects.create(category=self.category, user=self.user, title='Архивная', status=Goal.Status.archived)
+        self.titles = list(Goal.objects.exclude(status=Goal.Status.archived).order_by('id').values_list('title', flat=True))
+
+    def goals(self, text: str) -> list[str]:
+        self.tg_client.reset_mock()
+        VerifiedUserCondition(tg_user=self.tg_user, tg_client=self.tg_client, message=message(text)).run()
+        return self.sent()
+
+    def test_page_is_split_into_messages(self):
+        *messages, footer = self.goals('/goals')
+
+        self.assertGreater(len(messages), 1)
+        self.assertTrue(all(len(text) <= MESSAGE_LIMIT for text in messages))
+        self.assertEqual('\n'.join(messages).split('\n'), self.titles[:200])
+        self.assertEqual(footer, 'Страница 1. Следующая: /goals 2')
+
+    def test_last_page_has_no_footer(self):
+        messages = self.goals('/goals 2')
+        self.assertEqual('\n'.join(messages).split('\n'), self.titles[200:])
+
+    def test_filters_are_kept_in_footer(self):
+        to_do = list(Goal.objects.filter(status=Goal.Status.to_do).order_by('id').values_list('title', flat=True))
+        *messages, footer = self.goals('/goals to_do')
+        self.assertEqual('\n'.join(messages).split('\n'), to_do[:200])
+        self.assertEqual(footer, 'Страница 1. Следующая: /goals 2 to_do')
+
+        messages = self.goals('/goals 2 to_do')
+        self.assertEqual('\n'.join(messages).split('\n'), to_do[200:])
+
+    def test_status_and_priority_filters(self):
+        expected = list(
+            Goal.objects.filter(status=Goal.Status.to_do, priority=Goal.Priority.high)
+            .order_by('id').values_list('title', flat=True)
+        )
+        self.assertEqual('\n'.join(self.goals('/goals to_do high')).split('\n'), expected)
+
+    def test_count_summary(self):
+        self.assertEqual(self.goals('/goals count'), [
+            f'Всего целей: 300\n{Goal.Status.to_do.label}: 240\n{Goal.Status.done.label}: 60'
+        ])
+
+    def test_deleted_board_is_hidden(self):
+        other = Board.objects.create(title='Удалённая')
+        category = GoalCategory.objects.create(board=other, user=self.user, title='Удалённая')
+        Goal.objects.create(category=category, user=self.user, title='С удалённой доски', status=Goal.Status.in_progress)
+        other.is_deleted = True
+        other.save()
+
+        self.assertEqual(self.goals('/goals in_progress'), ['Целей пока нет.'])
+        self.assertTrue(self.goals('/goals count')[0].startswith('Всего целей: 300\n'))
+        self.assertNotIn('Удалённая', self.goals('/create')[0])
+
+    def test_plain_replies(self):
+        self.assertEqual(self.goals('/goals 3'), ['На этой странице целей нет.'])
+        self.assertEqual(self.goals('/goals in_progress'), ['Целей пока нет.'])
+        self.assertEqual(self.goals('/goals whatever'), [GOALS_HELP])
+
+
+STATE_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'bot': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bot'},
+}
+
+
+class ChatStateStoreTests(SimpleTestCase):
+    @mock.patch('bot.management.state.time.monotonic', return_value=1000.0)
+    def test_state_expires_after_ttl(self, monotonic):
+        store = ChatStateStore(ttl=60)
+        store.set(42, ConversationState(is_create_command=True))
+        monotonic.return_value = 1059.0
+        self.assertTrue(store.get('42').is_create_command)
+        monotonic.return_value = 1061.0
+        self.assertEqual(store.get(42), ConversationState())
+
+    def test_least_recently_used_is_evicted(self):
+        store = ChatStateStore(max_size=2)
+        for chat_id in (1, 2):
+            store.set(chat_id, ConversationState(category_for_create=chat_id))
+        store.get(1)
+        store.set(3, ConversationState(category_for_create=3))
+        self.assertEqual([store.get(chat_id).category_for_create for chat_id in (1, 2, 3)], [1, None, 3])
+
+    @override_settings(CACHES=STATE_CACHES)
+    def test_shared_cache_is_seen_by_other_processes(self):
+        state = ConversationState(is_create_command=True, category_for_create=7, categories={7: 'Работа'})
+        ChatStateStore(cache_alias='bot').set(42, state)
+
+        other = ChatStateStore(cache_alias='bot')
+        self.assertEqual(other.get(42), state)
+        other.clear(42)
+        self.assertEqual(ChatStateStore(cache_alias='bot').get(42), ConversationState())
+
+
+@override_settings(CACHES=STATE_CACHES)
+class CreateConversationTests(BotUserTestCase):
+    """Диалог /create, в котором каждое сообщение обрабатывает другой процесс с общим кешем состояний."""
+
+    def say(self, text: str) -> str:
+        self.tg_client.reset_mock()
+        with mock.patch('bot.management.condition.get_chat_states', lambda: ChatStateStore(cache_alias='bot')):
+            VerifiedUserCondition(tg_user=self.tg_user, tg_client=self.tg_client, message=message(text)).run()
+        return self.sent()[-1]
+
+    def test_goal_is_created_across_processes(self):
+        self.assertIn(f'{self.category.id}) Категория', self.say('/create'))
+        self.assertEqual(self.say(str(self.category.id)), 'Введите название цели.')
+        with CaptureQueriesContext(connection) as queries:
+            reply = self.say('Новая цель')
+        self.assertEqual(reply, 'Создана цель Новая цель в категории Категория.')
+        # категории уже в состоянии: название берётся оттуда, а не из базы
+        self.assertFalse([query for query in queries.captured_queries if '"goals_goalcategory"."title"' in query['sql']])
+        self.assertTrue(Goal.objects.filter(category=self.category, title='Новая цель').exists())
+        self.assertEqual(ChatStateStore(cache_alias='bot').get(42), ConversationState())
+
+    def test_unknown_category_is_rejected(self):
+        self.say('/create')
+        self.assertEqual(self.say('0'), 'Такой категории нет. Чтобы создать цель введите /create.')
+
+
+class TgIdentityCacheTests(BotUserTestCase):
+    def setUp(self):
+        super().setUp()
+        self.identities = get_tg_identities()
+        self.identities.invalidate(self.tg_user.telegram_chat_id)
+        self.addCleanup(self.identities.invalidate, self.tg_user.telegram_chat_id)
+
+    def test_linked_user_is_served_from_cache(self):
+        Chat(message(text='/goals')).set_condition(self.tg_client)
+
+        chat = Chat(message(text='/goals'))
+        with self.assertNumQueries(0):
+            chat.set_condition(self.tg_client)
+        self.assertIsInstance(chat.condition, VerifiedUserCondition)
+        self.assertEqual((chat.condition.tg_user.id, chat.condition.tg_user.user_id), (self.tg_user.id, self.user.id))
+
+    def test_unlinked_user_is_not_cached(self):
+        cache = TgIdentityCache()
+        cache.put(TgUser(telegram_chat_id='7', telegram_user_id='7'))
+        self.assertIsNone(cache.get(7))
+
+    def test_save_invalidates(self):
+        self.identities.put(self.tg_user)
+        self.tg_user.user = None
+        self.tg_user.save()
+        self.assertIsNone(self.identities.get(self.tg_user.telegram_chat_id))
+
+    @override_settings(CACHES=STATE_CACHES)
+    def test_shared_cache_invalidation_reaches_other_processes(self):
+        runbot, api = TgIdentityCache(cache_alias='bot'), TgIdentityCache(cache_alias='bot')
+        runbot.put(self.tg_user)
+        self.assertEqual(api.get(42), TgIdentity.from_tg_user(self.tg_user))
+
+        # сигнал TgUser в процессе API сбрасывает запись и для runbot
+        with mock.patch('bot.signals.get_tg_identities', return_value=api):
+            self.tg_user.delete()
+        self.assertIsNone(runbot.get(42))
+
+    @mock.patch('bot.management.identity.time.monotonic', return_value=1000.0)
+    def test_ttl_and_size_are_bounded(self, monotonic):
+        cache = TgIdentityCache(ttl=60, max_size=2)
+        for chat_id in ('1', '2', '3'):
+            cache.put(TgUser(id=int(chat_id), telegram_chat_id=chat_id, telegram_user_id=chat_id, user_id=self.user.id))
+        self.assertEqual([cache.get(chat_id) is not None for chat_id in (1, 2, 3)], [False, True, True])
+        monotonic.return_value = 1061.0
+        self.assertIsNone(cache.get(3))
+
+
+class DeadlineSchedulerTests(BotUserTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.scheduler = DeadlineScheduler(lead=timedelta(hours=1), horizon=timedelta(hours=6))
+
+    def goal(self, title: str, due_in: timedelta, user: User | None = None, **fields) -> Goal:
+        return Goal.objects.create(category=self.category, user=user or self.user, title=title,
+                                   due_date=self.now + due_in, **fields)
+
+    def tick(self, after: timedelta) -> int:
+        return self.scheduler.tick(self.now + after)
+
+    def test_reminder_is_queued_once_lead_before_due(self):
+        soon = self.goal('Скоро', timedelta(minutes=30))
+        later = self.goal('Позже', timedelta(hours=3))
+
+        self.assertEqual(self.tick(timedelta()), 1)
+        self.assertEqual(self.tick(timedelta(minutes=1)), 0)
+        self.assertEqual(self.tick(timedelta(hours=2, minutes=1)), 1)
+
+        self.assertEqual(list(TgGoalReminder.objects.order_by('id').values_list('goal_id', flat=True)), [soon.id, later.id])
+        texts = list(TgOutboxMessage.objects.order_by('id').values_list('chat_id', 'text'))
+        self.assertEqual([chat_id for chat_id, _ in texts], ['42', '42'])
+        self.assertIn('«Скоро»', texts[0][1])
+
+    def test_inactive_and_unlinked_goals_are_skipped(self):
+        stranger = User.objects.create_user(username='stranger', password='Pa55word!')
+        self.goal('Выполнена', timedelta(minutes=30), status=Goal.Status.done)
+        self.goal('Чужая', timedelta(minutes=30), user=stranger)
+
+        self.assertEqual(self.tick(timedelta()), 0)
+        self.assertFalse(TgOutboxMessage.objects.exists())
+
+    def test_moved_due_date_is_rescheduled(self):
+        goal = self.goal('Перенесённая', timedelta(hours=3))
+        self.assertEqual(self.tick(timedelta()), 0)
+
+        goal.due_date = self.now + timedelta(hours=5)
+        goal.save()
+
+        self.assertEqual(self.tick(timedelta(hours=2, minutes=1)), 0)
+        self.assertEqual(self.tick(timedelta(hours=4, minutes=1)), 1)
+        self.assertEqual(TgGoalReminder.objects.get().due_date, goal.due_date)
+
+    def test_window_is_extended(self):
+        self.goal('Далёкая', timedelta(hours=10))
+        self.assertEqual(self.tick(timedelta()), 0)
+        self.assertEqual(self.scheduler.entries, {})
+
+        self.assertEqual(self.tick(timedelta(hours=9, minutes=1)), 1)
+
+    def test_change_without_updated_is_caught_before_sending(self):
+        goal = self.goal('Архивная', timedelta(hours=2))
+        self.assertEqual(self.tick(timedelta()), 0)
+
+        # update() не меняет updated: цель остаётся в куче, но enqueue перепроверяет её по базе
+        Goal.objects.filter(id=goal.id).update(status=Goal.Status.archived)
+
+        self.assertEqual(self.tick(timedelta(hours=1, minutes=1)), 0)
+        self.assertFalse(TgOutboxMessage.objects.exists())
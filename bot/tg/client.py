@@ -1,15 +1,43 @@
+import random
+import time
+from collections.abc import Iterable
+
 import requests
 import logging
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 from bot.tg.dc import GetUpdatesResponse, SendMessageResponse
+from bot.tg.ratelimit import RateLimiter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 class TgClient:
-    def __init__(self, token):
+    """
+    Клиент Bot API: одна сессия с пулом keep-alive соединений на весь процесс,
+    явные таймауты, повторы с backoff и учётом retry_after, ограничение частоты отправки.
+    """
+
+    def __init__(self, token, api_url: str = 'https://api.telegram.org', pool_size: int = 10,
+                 connect_timeout: float = 5, read_timeout: float = 15, max_retries: int = 5,
+                 backoff: float = 0.5, max_backoff: float = 30, rate_limiter: RateLimiter | None = None):
         self.token = token
+        self.api_url = api_url.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter or RateLimiter(cache_alias=settings.BOT_RATE_LIMIT_CACHE or None)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def get_url(self, method: str):
-        return f"https://api.telegram.org/bot{self.token}/{method}"
+        return f"{self.api_url}/bot{self.token}/{method}"
 
     def get_updates(self, offset: int = 0, timeout: int = 60) -> GetUpdatesResponse:
         url = self.get_url('GetUpdates')
@@ -19,7 +47,8 @@ class TgClient:
         }
 
         try:
-            response = requests.get(url=url, params=params)
+            # read-таймаут больше long polling, иначе пустой ответ Telegram будет считаться ошибкой
+            response = self._request('GET', url, params=params, read_timeout=timeout + self.read_timeout)
         except Exception as e:
             logging.error('Не удалось получить обновления')
             raise e
@@ -33,9 +62,67 @@ class TgClient:
             'text': text
         }
         try:
-            response = requests.post(url=url, data=data)
+            response = self._request('POST', url, data=data, chat_id=chat_id)
         except Exception as e:
             logging.error('Не удалось отправить сообщение')
             raise e
         else:
             return SendMessageResponse(**response.json())
+
+    def send_messages(self, messages: Iterable[tuple[int, str]]) -> list[SendMessageResponse]:
+        """Отправка пачки: ограничитель частоты растягивает её во времени, а не упирается в 429."""
+        return [self.send_message(chat_id=chat_id, text=text) for chat_id, text in messages]
+
+    def set_webhook(self, url: str, secret_token: str, max_connections: int = 40) -> dict:
+        data = {
+            'url': url,
+            'secret_token': secret_token,
+            'max_connections': max_connections,
+            'allowed_updates': '["message"]',
+        }
+        return self._request('POST', self.get_url('setWebhook'), data=data).json()
+
+    def delete_webhook(self) -> dict:
+        return self._request('POST', self.get_url('deleteWebhook')).json()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _request(self, method: str, url: str, chat_id: int | None = None, read_timeout: float | None = None,
+                 **kwargs) -> requests.Response:
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+        attempt = 0
+        while True:
+            if method == 'POST':
+                self.rate_limiter.wait(chat_id)
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # POST после таймаута чтения не повторяем: сообщение могло уже уйти
+                if attempt >= self.max_retries or (method == 'POST' and isinstance(e, requests.ReadTimeout)):
+                    raise
+                delay = self._backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response) or self._backoff_delay(attempt)
+                logging.warning('Telegram ответил %s, повтор через %.1f с', response.status_code, delay)
+            attempt += 1
+            time.sleep(delay)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # full jitter: случайная пауза до экспоненциального предела
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float | None:
+        if response.status_code != 429:
+            return None
+        try:
+            return float(response.json()['parameters']['retry_after'])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(response.headers['Retry-After'])
+        except (ValueError, KeyError):
+            return None
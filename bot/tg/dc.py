@@ -40,3 +40,11 @@ class GetUpdatesResponse(BaseModel):
 class SendMessageResponse(BaseModel):
     ok: bool
     result: Message = ''
+    error_code: int | None = None
+    description: str | None = None
+
+    @property
+    def permanent_error(self) -> bool:
+        """4xx кроме 429 (чат не найден, бот заблокирован): повтор ничего не изменит."""
+        return not self.ok and self.error_code is not None and 400 <= self.error_code < 500 \
+            and self.error_code != 429
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket: reserve() возвращает, сколько секунд подождать до отправки."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # уходим в минус: следующий вызов получит паузу больше, так отправки распределяются равномерно
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class SharedWindow:
+    """
+    Предел запросов в секунду, общий для всех процессов: счётчик текущей секунды в кеше Django.
+    incr в Redis и memcached атомарен, поэтому runbot и send_outbox делят один бюджет.
+    acquire() ждёт следующей секунды, пока в текущей нет места.
+    """
+    key_prefix = 'bot:tg_rate:'
+
+    def __init__(self, rate: int, cache_alias: str):
+        self.rate = rate
+        self.cache = caches[cache_alias]
+
+    def acquire(self) -> None:
+        while True:
+            now = time.time()
+            second = int(now)
+            key = f'{self.key_prefix}{second}'
+            self.cache.add(key, 0, timeout=10)
+            try:
+                count = self.cache.incr(key)
+            except ValueError:
+                # ключ вытеснен между add и incr: считаем секунду заново
+                continue
+            if count <= self.rate:
+                return
+            time.sleep(second + 1 - now)
+
+
+class RateLimiter:
+    """
+    Ограничения Telegram: около 30 сообщений в секунду на бота и около одного
+    в секунду в один чат. Корзины чатов хранятся в LRU, чтобы память не росла.
+    С cache_alias общий предел бота считается в общем кеше (SharedWindow): иначе каждый
+    процесс, отправляющий сообщения, получил бы свои 30 в секунду. Предел чата остаётся
+    в памяти процесса: в один чат пишет в основном runbot.
+    """
+
+    def __init__(self, global_rate: float = 30, chat_rate: float = 1, chat_burst: float = 3,
+                 max_chats: int = 10_000, cache_alias: str | None = None):
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=global_rate)
+        self.shared = SharedWindow(rate=int(global_rate), cache_alias=cache_alias) if cache_alias else None
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self._chats: OrderedDict[int, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        with self._lock:
+            bucket = self._chats.get(chat_id)
+            if bucket is None:
+                bucket = self._chats[chat_id] = TokenBucket(rate=self.chat_rate, capacity=self.chat_burst)
+                if len(self._chats) > self.max_chats:
+                    self._chats.popitem(last=False)
+            else:
+                self._chats.move_to_end(chat_id)
+            return bucket
+
+    def wait(self, chat_id: int | None = None) -> None:
+        delay = self.global_bucket.reserve() if self.shared is None else 0.0
+        if chat_id is not None:
+            delay = max(delay, self._chat_bucket(chat_id).reserve())
+        if delay > 0:
+            time.sleep(delay)
+        if self.shared is not None:
+            self.shared.acquire()
@@ -1,10 +1,17 @@
+import hmac
+
+from django.conf import settings
+from django.db import transaction
+from pydantic import ValidationError
+from rest_framework import status
 from rest_framework.generics import UpdateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from bot import inbox, outbox
 from bot.serializers import TgUserSerializer
-from bot.tg.client import TgClient
-from todolist import settings
+from bot.tg.dc import UpdateObj
 
 
 class BotVerificationView(UpdateAPIView):
@@ -18,8 +25,34 @@ class BotVerificationView(UpdateAPIView):
         return Response(serializer.data)
 
     def perform_update(self, serializer):
-        tg_user = serializer.save()
-        tg_client = TgClient(settings.BOT_TOKEN)
-        tg_client.send_message(chat_id=tg_user.telegram_chat_id,
-                               text='''Аккаунт успешно привязан!\n
+        # сообщение попадает в outbox в той же транзакции, отправит его send_outbox
+        with transaction.atomic():
+            tg_user = serializer.save()
+            outbox.enqueue(chat_id=tg_user.telegram_chat_id,
+                           text='''Аккаунт успешно привязан!\n
     Доступные команды:\n"/goals" — получить список целей\n"/create" — создать новую цель''')
+
+
+class BotWebhookView(APIView):
+    """
+    Приём обновлений Telegram через webhook, альтернатива long polling.
+    Обновление сохраняется в базу до ответа 200 и обрабатывается процессом runbot.
+    """
+    authentication_classes = []
+    permission_classes = []
+    secret_header = 'HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN'
+
+    def post(self, request, *args, **kwargs):
+        secret = settings.BOT_WEBHOOK_SECRET
+        if not secret or not hmac.compare_digest(request.META.get(self.secret_header, ''), secret):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            item = UpdateObj.parse_obj(request.data)
+        except ValidationError:
+            # обновления без текстового сообщения боту не нужны; 200, чтобы Telegram их не повторял
+            return Response(status=status.HTTP_200_OK)
+
+        # если запись не удалась, ответ будет 500 и Telegram доставит обновление повторно
+        inbox.store(item.update_id, item.message.chat.id, request.data)
+        return Response(status=status.HTTP_200_OK)
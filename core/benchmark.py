@@ -0,0 +1,200 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from bot.models import TgUser
+from core.models import User
+from goals.models import BoardParticipant, Goal, GoalCategory, GoalComment
+from goals.seed import SeedPlan, seed
+
+BENCH_PASSWORD = 'Bench-password-1'
+
+
+@dataclass
+class Case:
+    """Эндпоинт для замера: url с плейсхолдерами из BenchContext и тело запроса (вызывается на каждой итерации)."""
+    name: str
+    method: str
+    url: str
+    body: Callable[['BenchContext', int], dict] | None = None
+    # смена пароля сбрасывает сессию — после запроса логинимся заново
+    relogin: bool = False
+
+
+class BenchContext:
+    """Пользователь бенчмарка — владелец нескольких досок — и id его объектов для подстановки в url."""
+
+    def __init__(self, boards: list[int], boards_per_user: int):
+        now = timezone.now()
+        self.user = User.objects.create_user(username='bench', password=BENCH_PASSWORD)
+        self.board_ids = boards[:boards_per_user]
+        BoardParticipant.objects.bulk_create([
+            BoardParticipant(board_id=board_id, user=self.user, role=BoardParticipant.Role.owner, created=now, updated=now)
+            for board_id in self.board_ids
+        ])
+        self.board = self.board_ids[0]
+        self.category = (
+            GoalCategory.objects.filter(board_id=self.board, is_deleted=False).values_list('id', flat=True).first()
+        )
+        # архивная цель не типична для goal/<pk>: её не видно в списках и её не редактируют
+        self.goal = (
+            Goal.objects.filter(category_id=self.category).exclude(status=Goal.Status.archived)
+            .values_list('id', flat=True).first()
+        )
+        self.comment = GoalComment.objects.create(goal_id=self.goal, user=self.user, text='bench').id
+        self.participants = [
+            {'user': username, 'role': BoardParticipant.Role.writer}
+            for username in BoardParticipant.objects.filter(board_id=self.board).exclude(user=self.user)
+            .values_list('user__username', flat=True)
+        ]
+
+    def relogin(self, client: Client) -> None:
+        self.user.refresh_from_db()
+        client.force_login(self.user)
+
+    def ids(self) -> dict:
+        return {'board': self.board, 'category': self.category, 'goal': self.goal, 'comment': self.comment}
+
+    def verification_code(self, iteration: int) -> str:
+        tg_user = TgUser.objects.create(telegram_chat_id=f'bench{iteration}-{time.monotonic_ns()}',
+                                        telegram_user_id=f'bench{iteration}-{time.monotonic_ns()}')
+        return tg_user.set_verification_code()
+
+
+CASES = (
+    Case('core/profile', 'GET', '/core/profile'),
+    Case('core/signup', 'POST', '/core/signup', lambda ctx, i: {
+        'username': f'bench_signup_{i}_{time.monotonic_ns()}', 'password': BENCH_PASSWORD, 'password_repeat': BENCH_PASSWORD,
+    }),
+    Case('core/login', 'POST', '/core/login', lambda ctx, i: {'username': 'bench', 'password': BENCH_PASSWORD}),
+    Case('core/update_password', 'PUT', '/core/update_password', lambda ctx, i: {
+        'old_password': BENCH_PASSWORD, 'new_password': BENCH_PASSWORD,
+    }, relogin=True),
+    Case('board/list', 'GET', '/goals/board/list?limit=100'),
+    Case('board/<pk>', 'GET', '/goals/board/{board}'),
+    Case('board/<pk>/stats', 'GET', '/goals/board/{board}/stats'),
+    Case('board/create', 'POST', '/goals/board/create', lambda ctx, i: {'title': f'bench {i}'}),
+    Case('board/<pk> update', 'PUT', '/goals/board/{board}', lambda ctx, i: {
+        'title': f'bench {i}', 'participants': ctx.participants,
+    }),
+    Case('goal_category/list', 'GET', '/goals/goal_category/list?limit=100'),
+    Case('goal_category/<pk>', 'GET', '/goals/goal_category/{category}'),
+    Case('goal_category/create', 'POST', '/goals/goal_category/create', lambda ctx, i: {
+        'title': f'bench {i}', 'board': ctx.board,
+    }),
+    Case('goal/list', 'GET', '/goals/goal/list?limit=100'),
+    Case('goal/list cursor', 'GET', '/goals/goal/list?pagination=cursor&limit=100'),
+    Case('goal/list search', 'GET', '/goals/goal/list?search=Цель&limit=100'),
+    Case('goal/<pk>', 'GET', '/goals/goal/{goal}'),
+    Case('goal/create', 'POST', '/goals/goal/create', lambda ctx, i: {'title': f'bench {i}', 'category': ctx.category}),
+    Case('goal/<pk> update', 'PATCH', '/goals/goal/{goal}', lambda ctx, i: {'title': f'bench {i}'}),
+    Case('goal/bulk', 'POST', '/goals/goal/bulk', lambda ctx, i: {'operations': [
+        {'op': 'create', 'title': f'bench {i}.{n}', 'category': ctx.category} for n in range(10)
+    ]}),
+    Case('goal_comment/list', 'GET', '/goals/goal_comment/list?limit=100'),
+    Case('goal_comment/<pk>', 'GET', '/goals/goal_comment/{comment}'),
+    Case('goal_comment/create', 'POST', '/goals/goal_comment/create', lambda ctx, i: {'goal': ctx.goal, 'text': f'{i}'}),
+    Case('goal_comment/<pk> update', 'PATCH', '/goals/goal_comment/{comment}', lambda ctx, i: {'text': f'{i}'}),
+    Case('bot/verify', 'PATCH', '/bot/verify', lambda ctx, i: {'verification_code': ctx.verification_code(i)}),
+)
+
+
+def percentile(values: list[float], percent: int) -> float:
+    if not values:
+        raise ValueError('Нет замеров для процентиля')
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def run_case(client: Client, ctx: BenchContext, case: Case, iterations: int, warmup: int) -> dict:
+    if iterations < 1:
+        raise ValueError('iterations должно быть не меньше 1')
+    url = case.url.format(**ctx.ids())
+    timings, queries, status = [], [], None
+    for iteration in range(warmup + iterations):
+        body = case.body(ctx, iteration) if case.body else None
+        kwargs = {'data': json.dumps(body), 'content_type': 'application/json'} if body is not None else {}
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = client.generic(case.method, url, **kwargs)
+            elapsed = time.perf_counter() - started
+        status = response.status_code
+        if case.relogin:
+            ctx.relogin(client)
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(len(context))
+
+    # память — отдельным прогоном: tracemalloc заметно замедляет запрос
+    body = case.body(ctx, warmup + iterations) if case.body else None
+    kwargs = {'data': json.dumps(body), 'content_type': 'application/json'} if body is not None else {}
+    tracemalloc.start()
+    client.generic(case.method, url, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if case.relogin:
+        ctx.relogin(client)
+
+    return {
+        'name': case.name, 'method': case.method, 'url': url, 'status': status,
+        'p50_ms': round(percentile(timings, 50), 2), 'p90_ms': round(percentile(timings, 90), 2),
+        'p99_ms': round(percentile(timings, 99), 2), 'mean_ms': round(statistics.fmean(timings), 2),
+        'queries': int(statistics.median(queries)), 'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_size(goals: int, iterations: int, warmup: int, boards_per_user: int, with_cache: bool,
+             cases: tuple[Case, ...] = CASES, report: Callable[[str], None] = print) -> dict:
+    """Один размер: очистка базы, генерация данных, замер всех эндпоинтов."""
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+
+    started = time.perf_counter()
+    seeded = seed(SeedPlan(goals=goals))
+    seed_seconds = time.perf_counter() - started
+    report(f'{goals} целей: данные за {seed_seconds:.1f} с {seeded.counts}')
+
+    ctx = BenchContext(seeded.board_ids, boards_per_user)
+    client = Client()
+    client.force_login(ctx.user)
+    endpoints = []
+    with override_settings(**({} if with_cache else {'RESPONSE_CACHE_TIMEOUT': 0})):
+        for case in cases:
+            result = run_case(client, ctx, case, iterations, warmup)
+            endpoints.append(result)
+            report(f'  {result["status"]} {case.method:6} {case.name:28} p50 {result["p50_ms"]:8.2f} мс  '
+                   f'p99 {result["p99_ms"]:8.2f} мс  запросов {result["queries"]:3}  память {result["peak_kb"]:8.1f} КБ')
+    return {'goals': goals, 'seed_seconds': round(seed_seconds, 2), 'counts': seeded.counts, 'endpoints': endpoints}
+
+
+def meta() -> dict:
+    return {
+        'created': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+    }
+
+
+def compare(previous: dict, current: dict) -> list[tuple[int, str, float, float]]:
+    """Пары (размер, эндпоинт, p50 было, p50 стало) для эндпоинтов, замеренных в обоих прогонах."""
+    before = {(run['goals'], item['name']): item['p50_ms'] for run in previous['runs'] for item in run['endpoints']}
+    rows = []
+    for run in current['runs']:
+        for item in run['endpoints']:
+            if (key := (run['goals'], item['name'])) in before:
+                rows.append((*key, before[key], item['p50_ms']))
+    return rows
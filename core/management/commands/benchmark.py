@@ -0,0 +1,57 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = '''Бенчмарк эндпоинтов core, goals и bot/verify на данных разного объёма.
+Работает в отдельной тестовой базе (как manage.py test): SQLite или PostgreSQL из настроек.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                            help='Число целей для каждого прогона, например 1000 10000 100000 1000000')
+        parser.add_argument('--iterations', type=int, default=30, help='Замеров на эндпоинт')
+        parser.add_argument('--warmup', type=int, default=3, help='Прогревочных запросов на эндпоинт')
+        parser.add_argument('--boards-per-user', type=int, default=10, help='Досок у пользователя бенчмарка')
+        parser.add_argument('--with-cache', action='store_true', help='Не выключать кеш ответов списков')
+        parser.add_argument('--only', nargs='+', help='Только эндпоинты с этими именами (см. core.benchmark.CASES)')
+        parser.add_argument('--output', default='benchmark.json', help='Куда сохранить результаты')
+        parser.add_argument('--compare', help='JSON предыдущего прогона для сравнения p50')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations должно быть не меньше 1, --warmup — не меньше 0')
+        cases = benchmark.CASES
+        if options['only']:
+            cases = tuple(case for case in cases if case.name in options['only'])
+
+        # строки лога на каждый запрос и 4xx от django.request только мешают выводу
+        logging.getLogger('todolist.requests').setLevel(logging.WARNING)
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            result = {'meta': benchmark.meta(), 'runs': [
+                benchmark.run_size(size, options['iterations'], options['warmup'], options['boards_per_user'],
+                                   options['with_cache'], cases, report=self.stdout.write)
+                for size in options['sizes']
+            ]}
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Результаты сохранены в {options["output"]}'))
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                previous = json.load(file)
+            for size, name, before, after in benchmark.compare(previous, result):
+                ratio = after / before if before else float('inf')
+                style = self.style.ERROR if ratio > 1.2 else self.style.SUCCESS if ratio < 0.8 else str
+                self.stdout.write(style(f'{size:>9} {name:28} {before:8.2f} → {after:8.2f} мс  x{ratio:.2f}'))
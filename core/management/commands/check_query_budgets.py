@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.models import User
+from core.query_budget import ENDPOINT_BUDGETS, QueryBudgetExceeded, check_endpoint
+from goals.models import Board, Goal, GoalCategory, GoalComment
+
+
+class Command(BaseCommand):
+    help = '''Проверяет бюджет SQL-запросов эндпоинтов на текущих данных от имени пользователя.
+Завершается с ошибкой, если хотя бы один эндпоинт превысил бюджет — для проверки перед деплоем.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Пользователь с досками, целями и комментариями')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["username"]} не найден')
+
+        ids = self.sample_ids(user)
+        client = Client()
+        client.force_login(user)
+
+        failed = 0
+        with override_settings(RESPONSE_CACHE_TIMEOUT=0, ALLOWED_HOSTS=['*']):
+            for method, template, budget in ENDPOINT_BUDGETS:
+                try:
+                    url = template.format(**ids)
+                except KeyError as e:
+                    self.stdout.write(self.style.WARNING(f'{template}: нет объекта {e}, пропуск'))
+                    continue
+                try:
+                    response = check_endpoint(client, method, url, budget)
+                except (QueryBudgetExceeded, AssertionError) as e:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(str(e)))
+                else:
+                    self.stdout.write(f'{method} {url}: {response.get("Server-Timing", "")}')
+
+        if failed:
+            raise CommandError(f'Бюджет превышен у {failed} эндпоинтов')
+        self.stdout.write(self.style.SUCCESS('Все эндпоинты уложились в бюджет'))
+
+    @staticmethod
+    def sample_ids(user: User) -> dict[str, int]:
+        boards = Board.objects.filter(participants__user=user, is_deleted=False)
+        categories = GoalCategory.objects.filter(board__in=boards, is_deleted=False)
+        goals = Goal.objects.filter(category__in=categories).exclude(status=Goal.Status.archived)
+        comments = GoalComment.objects.filter(goal__in=goals)
+        samples = {'board': boards, 'category': categories, 'goal': goals, 'comment': comments}
+        ids = {}
+        for name, queryset in samples.items():
+            if (pk := queryset.values_list('id', flat=True).first()) is not None:
+                ids[name] = pk
+        return ids
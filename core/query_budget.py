@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+# Предельное число SQL-запросов на эндпоинт при любом объёме данных.
+# Учитываются и запросы сессии/пользователя; кеш ответов при проверке выключается.
+# Плейсхолдеры {goal}, {category}, {comment}, {board} заменяются id объектов, доступных пользователю.
+ENDPOINT_BUDGETS = (
+    ('GET', '/core/profile', 3),
+    ('GET', '/goals/board/list?limit=100', 5),
+    ('GET', '/goals/board/{board}', 6),
+    # категории, сводка и число просроченных целей
+    ('GET', '/goals/board/{board}/stats', 6),
+    ('GET', '/goals/goal_category/list?limit=100', 6),
+    ('GET', '/goals/goal_category/{category}', 5),
+    ('GET', '/goals/goal/list?limit=100', 6),
+    ('GET', '/goals/goal/list?pagination=cursor&limit=100', 5),
+    # +1: на новом соединении SQLite один раз проверяется наличие таблицы FTS5
+    ('GET', '/goals/goal/list?search=a&limit=100', 7),
+    ('GET', '/goals/goal/{goal}', 5),
+    ('GET', '/goals/goal_comment/list?limit=100', 6),
+    ('GET', '/goals/goal_comment/{comment}', 5),
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = '', using: str = 'default'):
+    """
+    Проверка бюджета запросов для кода внутри блока:
+
+        with query_budget(5, 'goal/list'):
+            client.get('/goals/goal/list')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > max_queries:
+        queries = '\n'.join(f'  {query["sql"]}' for query in context.captured_queries)
+        raise QueryBudgetExceeded(f'{label}: {len(context)} запросов при бюджете {max_queries}\n{queries}')
+
+
+def check_endpoint(client, method: str, url: str, max_queries: int, **kwargs):
+    """Выполняет запрос тестовым клиентом и проверяет бюджет; возвращает ответ."""
+    with query_budget(max_queries, f'{method} {url}'):
+        response = client.generic(method, url, **kwargs)
+    if response.status_code >= 400:
+        raise AssertionError(f'{method} {url}: ответ {response.status_code}')
+    return response
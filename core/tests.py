@@ -1,3 +1,63 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from core.benchmark import BenchContext, percentile
+from core.management.commands.check_query_budgets import Command as CheckQueryBudgets
+from core.query_budget import ENDPOINT_BUDGETS, QueryBudgetExceeded, check_endpoint, query_budget
+from goals.models import BoardParticipant, Goal
+from goals.seed import SeedPlan, seed
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=0, MEMBERSHIP_CACHE_TIMEOUT=0)
+class QueryBudgetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(SeedPlan(goals=300, users=4, boards=3, comments_per_goal=1))
+        cls.user = BoardParticipant.objects.filter(role=BoardParticipant.Role.owner).order_by('id').first().user
+
+    def test_endpoints_fit_budgets(self):
+        self.client.force_login(self.user)
+        ids = CheckQueryBudgets.sample_ids(self.user)
+        self.assertEqual(set(ids), {'board', 'category', 'goal', 'comment'})
+        for method, template, budget in ENDPOINT_BUDGETS:
+            url = template.format(**ids)
+            with self.subTest(url=url):
+                check_endpoint(self.client, method, url, budget)
+
+    def test_check_query_budgets_command(self):
+        stdout = io.StringIO()
+        call_command('check_query_budgets', self.user.username, stdout=stdout)
+        self.assertIn('Все эндпоинты уложились в бюджет', stdout.getvalue())
+
+    def test_budget_exceeded(self):
+        self.client.force_login(self.user)
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1, 'goal/list'):
+                self.client.get('/goals/goal/list?limit=100')
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_percentile(self):
+        self.assertEqual(percentile([5.0], 99), 5.0)
+        self.assertEqual(percentile([float(value) for value in range(1, 102)], 50), 51.0)
+        with self.assertRaises(ValueError):
+            percentile([], 50)
+
+    def test_benchmark_requires_iterations(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark', '--iterations', '0', stdout=io.StringIO())
+
+
+class BenchContextTests(TestCase):
+    def test_goal_is_not_archived(self):
+        # все цели первой категории, кроме последней, — в архиве
+        seeded = seed(SeedPlan(goals=40, users=4, boards=1, categories_per_board=1))
+        last = Goal.objects.order_by('id').last()
+        Goal.objects.exclude(id=last.id).update(status=Goal.Status.archived)
+
+        ctx = BenchContext(seeded.board_ids, boards_per_user=1)
+        self.assertEqual(ctx.goal, last.id)
+        self.assertEqual(ctx.category, last.category_id)
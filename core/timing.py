@@ -0,0 +1,97 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+logger = logging.getLogger('todolist.requests')
+
+_current: ContextVar['RequestTiming | None'] = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Счётчики одного запроса: SQL (число и время) и именованные участки (serialize, render)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.sections: dict[str, float] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: вызывается для каждого запроса на любом соединении
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+    def add(self, name: str, seconds: float) -> None:
+        self.sections[name] = self.sections.get(name, 0.0) + seconds
+
+    def metrics(self) -> dict[str, float]:
+        total = time.perf_counter() - self.started
+        result = {'db': self.sql, **self.sections}
+        result['app'] = max(total - sum(result.values()), 0.0)
+        result['total'] = total
+        return result
+
+
+def current_timing() -> RequestTiming | None:
+    return _current.get()
+
+
+@contextmanager
+def track(name: str):
+    """Засекает участок кода текущего запроса; вне запроса ничего не делает."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """
+    Заголовок Server-Timing (db, serialize, render, app, total) и строка лога
+    todolist.requests с теми же значениями и числом SQL-запросов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        metrics = timing.metrics()
+        header = ', '.join(
+            f'{name};dur={seconds * 1000:.1f}' + (f';desc="{timing.queries} queries"' if name == 'db' else '')
+            for name, seconds in metrics.items()
+        )
+        response['Server-Timing'] = header
+        logger.info(
+            '%s %s %s: %s запросов, %.1f мс', request.method, request.path, response.status_code,
+            timing.queries, metrics['total'] * 1000,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'db_queries': timing.queries,
+                **{f'{name}_ms': round(seconds * 1000, 1) for name, seconds in metrics.items()},
+            },
+        )
+        return response
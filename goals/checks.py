@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# кеши, которые живут в памяти одного процесса: воркеры gunicorn и команды их не разделяют
+PROCESS_LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache', )
+
+
+def is_process_local(alias: str = 'default') -> bool:
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_BACKENDS
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs) -> list[Error]:
+    errors = []
+    if settings.MEMBERSHIP_CACHE_TIMEOUT and is_process_local():
+        errors.append(Error(
+            'Кеш ролей участников досок включён, а кеш Django хранится в памяти процесса: '
+            'удалённый или пониженный участник сохранит доступ через другие воркеры.',
+            hint='Задайте общий CACHE_URL (redis://, memcached://) или MEMBERSHIP_CACHE_TIMEOUT=0.',
+            id='goals.E001',
+        ))
+    if settings.RESPONSE_CACHE_TIMEOUT and is_process_local():
+        errors.append(Error(
+            'Кеш ответов списков включён, а кеш Django хранится в памяти процесса: '
+            'поколения досок, изменённые в одном воркере или команде, не видны остальным, '
+            'и они отдают устаревшие списки.',
+            hint='Задайте общий CACHE_URL (redis://, memcached://) или RESPONSE_CACHE_TIMEOUT=0.',
+            id='goals.E002',
+        ))
+    return errors
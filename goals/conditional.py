@@ -0,0 +1,65 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.timing import track
+from goals.response_cache import list_fingerprint
+
+
+def make_etag(*parts) -> str:
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # If-None-Match сравнивается слабо: W/ не мешает совпадению
+    return '*' in etags or etag in {tag.removeprefix('W/') for tag in etags}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+class ConditionalRetrieveMixin:
+    """
+    ETag для детального GET по id и updated объекта (см. get_etag_parts).
+    При совпадении If-None-Match отвечаем 304, не сериализуя объект.
+    """
+
+    def get_etag_parts(self, instance) -> tuple:
+        return instance.pk, instance.updated
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = make_etag(type(instance).__name__, request.user.id, *self.get_etag_parts(instance))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        with track('serialize'):
+            data = self.get_serializer(instance).data
+        return Response(data, headers={'ETag': etag})
+
+
+class ConditionalListMixin:
+    """
+    ETag для списка — отпечаток из кеша ответов (list_fingerprint): параметры запроса и поколения
+    досок пользователя. Любая запись в доску, в том числе в профиль автора, меняет поколение,
+    поэтому проверка не читает таблицу списка. Поколениям можно верить только в общем кеше:
+    пока кеш ответов выключен, ETag не выдаётся.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_TIMEOUT:
+            return super().list(request, *args, **kwargs)
+        etag = '"%s"' % list_fingerprint(self, request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
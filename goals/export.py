@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterable, Iterator
+
+from django.db.models import QuerySet
+
+from goals.models import Goal, GoalComment
+
+CHUNK_SIZE = 2000
+
+GOAL_COLUMNS = {
+    'id': 'id', 'title': 'title', 'description': 'description', 'status': 'status', 'priority': 'priority',
+    'due_date': 'due_date', 'created': 'created', 'updated': 'updated', 'user': 'user_id',
+    'category': 'category_id', 'category_title': 'category__title', 'board': 'board_id',
+}
+COMMENT_COLUMNS = {
+    'id': 'id', 'goal': 'goal_id', 'text': 'text', 'user': 'user_id',
+    'created': 'created', 'updated': 'updated', 'board': 'board_id',
+}
+
+
+def goals_queryset(board_ids: Iterable[int]) -> QuerySet:
+    # те же цели, что в goal/list: доски берутся из карты членства, без join на участников
+    return Goal.objects.filter(
+        board_id__in=list(board_ids), category__is_deleted=False,
+    ).exclude(status=Goal.Status.archived).order_by('id')
+
+
+def comments_queryset(board_ids: Iterable[int]) -> QuerySet:
+    return GoalComment.objects.filter(board_id__in=list(board_ids)).order_by('id')
+
+
+def export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(queryset: QuerySet, columns: dict[str, str], chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Строки из серверного курсора (в PostgreSQL — именованный курсор), по chunk_size за раз."""
+    names = list(columns)
+    for values in queryset.values_list(*columns.values()).iterator(chunk_size=chunk_size):
+        yield {name: export_value(value) for name, value in zip(names, values)}
+
+
+def ndjson_stream(sources: list[tuple[str, Iterator[dict]]], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Одна JSON-строка на объект, с полем type; строки отдаются пачками, чтобы не дробить ответ."""
+    lines = []
+    for kind, rows in sources:
+        for row in rows:
+            lines.append(json.dumps({'type': kind, **row}, ensure_ascii=False))
+            if len(lines) >= chunk_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def csv_stream(columns: list[str], rows: Iterator[dict], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import BinaryIO, Iterator
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from core.models import User
+from goals import response_cache, stats
+from goals.membership import BoardMembership
+from goals.models import Goal, GoalCategory
+from goals.seed import copy_rows
+from goals.serializers import GoalImportRowSerializer
+
+FORMATS = ('csv', 'ndjson')
+MAX_REPORTED_ERRORS = 1000
+
+# line, данные строки, ошибка разбора
+Record = tuple[int, dict | None, str | None]
+
+
+def detect_format(filename: str) -> str | None:
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension in ('jsonl', 'ndjson', 'json'):
+        return 'ndjson'
+    return extension if extension in FORMATS else None
+
+
+def iter_records(file: BinaryIO, input_format: str) -> Iterator[Record]:
+    """Строки файла по одной: файл читается потоком и целиком в память не попадает."""
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='' if input_format == 'csv' else None)
+    if input_format == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            # пустые ячейки — отсутствующие значения, лишние колонки отбрасываются
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ('', None)}, None
+        return
+
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield line_number, None, f'Invalid JSON: {error}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Expected a JSON object'
+        elif record.get('type', 'goal') == 'goal':
+            # строки комментариев из выгрузки goals/export пропускаются
+            yield line_number, record, None
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+    # последняя строка файла, обработка которой зафиксирована: продолжать с after_line=last_line
+    last_line: int = 0
+    complete: bool = True
+    # импорт прерван ошибкой базы, а не остановлен по time_limit
+    aborted: bool = False
+    # почему импорт остановлен до конца файла
+    detail: str = ''
+
+    def error(self, line: int, errors) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def stop(self, detail: str, aborted: bool = False) -> None:
+        self.complete = False
+        self.aborted = aborted
+        self.detail = detail
+
+    def as_dict(self) -> dict:
+        data = {'created': self.created, 'failed': self.failed, 'errors': self.errors,
+                'last_line': self.last_line, 'complete': self.complete}
+        if self.detail:
+            data['detail'] = self.detail
+        return data
+
+
+class GoalImporter:
+    """
+    Импорт целей порциями по batch_size строк. Доступ проверяется один раз на категорию,
+    вставка — bulk_create или COPY в PostgreSQL, каждая порция в своей транзакции:
+    ошибочные строки попадают в отчёт и не мешают остальным.
+    Если импорт остановлен ошибкой базы или по time_limit, записанные порции остаются,
+    а result.last_line показывает, с какой строки продолжить (after_line).
+    """
+
+    def __init__(self, user: User, batch_size: int = 1000, use_copy: bool | None = None,
+                 time_limit: float | None = None):
+        self.user = user
+        self.batch_size = batch_size
+        self.time_limit = time_limit
+        self.use_copy = connection.vendor == 'postgresql' if use_copy is None else use_copy
+        self.membership = BoardMembership(user.id)
+        # категория -> доска; None — категории нет или она недоступна
+        self.category_boards: dict[int, int | None] = {}
+        # один экземпляр на весь импорт: поля сериализатора копируются при каждом создании
+        self.row_serializer = GoalImportRowSerializer()
+        self.result = ImportResult()
+
+    def run(self, records: Iterator[Record], after_line: int = 0) -> ImportResult:
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        self.result.last_line = after_line
+        records = (record for record in records if record[0] > after_line)
+        chunk = list(islice(records, self.batch_size))
+        while chunk:
+            try:
+                self.import_chunk(chunk)
+            except DatabaseError as error:
+                self.result.stop(f'Ошибка базы данных: {error}', aborted=True)
+                break
+            self.result.last_line = chunk[-1][0]
+            chunk = list(islice(records, self.batch_size))
+            if chunk and deadline is not None and time.monotonic() > deadline:
+                self.result.stop('Превышено время импорта')
+                break
+        self.result.errors.sort(key=lambda error: error['line'])
+        return self.result
+
+    def import_chunk(self, chunk: list[Record]) -> None:
+        """Порция целиком: ошибки строк попадают в отчёт, только если порция записана."""
+        rows: list[tuple[int, dict]] = []
+        errors: list[tuple[int, dict]] = []
+        for line, record, error in chunk:
+            if error:
+                errors.append((line, {'non_field_errors': [error]}))
+                continue
+            try:
+                rows.append((line, self.row_serializer.run_validation(record)))
+            except ValidationError as exc:
+                errors.append((line, as_serializer_error(exc)))
+
+        self.load_categories({data['category'] for _, data in rows})
+        now = timezone.now()
+        goals, boards = [], set()
+        for line, data in rows:
+            board_id = self.category_boards[data['category']]
+            if board_id is None:
+                errors.append((line, {'category': ['Category not found']}))
+                continue
+            if not self.membership.can_write(board_id):
+                errors.append((line, {'detail': 'Permission denied'}))
+                continue
+            boards.add(board_id)
+            goals.append({
+                'title': data['title'], 'description': data.get('description') or None,
+                'category_id': data['category'], 'board_id': board_id, 'user_id': self.user.id,
+                'status': data.get('status', Goal.Status.to_do), 'priority': data.get('priority', Goal.Priority.low),
+                'due_date': data.get('due_date'), 'created': now, 'updated': now,
+            })
+
+        if goals:
+            self.insert(goals)
+            # bulk_create и COPY не отправляют сигналы
+            response_cache.bump(*boards)
+            self.result.created += len(goals)
+        for line, line_errors in errors:
+            self.result.error(line, line_errors)
+
+    def load_categories(self, category_ids: set[int]) -> None:
+        new_ids = category_ids - self.category_boards.keys()
+        if not new_ids:
+            return
+        found = dict(GoalCategory.objects.filter(
+            id__in=new_ids, is_deleted=False, board_id__in=list(self.membership.roles),
+        ).values_list('id', 'board_id'))
+        for category_id in new_ids:
+            self.category_boards[category_id] = found.get(category_id)
+
+    def insert(self, goals: list[dict]) -> None:
+        with transaction.atomic():
+            if self.use_copy:
+                columns = [f.column for f in Goal._meta.concrete_fields if not f.primary_key]
+                with connection.cursor() as cursor:
+                    copy_rows(cursor, Goal, columns, goals)
+            else:
+                Goal.objects.bulk_create([Goal(**goal) for goal in goals])
+            stats.apply(Counter((goal['category_id'], goal['status'], goal['priority']) for goal in goals))
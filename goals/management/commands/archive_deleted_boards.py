@@ -0,0 +1,83 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from goals import response_cache, stats
+from goals.models import Board, Goal, GoalCategory
+
+
+class Command(BaseCommand):
+    help = '''Архивирует цели и категории удалённых досок небольшими порциями.
+Прогресс хранится в самих данных, поэтому команду можно прервать и запустить повторно.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Строк за одну транзакцию')
+        parser.add_argument('--pause', type=float, default=0.1, help='Пауза между порциями, сек')
+        parser.add_argument('--board', type=int, action='append', help='Обработать только эти доски')
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, проверяя новые удаления')
+        parser.add_argument('--interval', type=float, default=30, help='Пауза между проходами в режиме --loop, сек')
+
+    def handle(self, *args, **options):
+        while True:
+            for board_id in self.pending_boards(options['board']):
+                self.archive_board(board_id, options['chunk_size'], options['pause'])
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    @staticmethod
+    def pending_boards(board_ids: list[int] | None) -> list[int]:
+        boards = Board.objects.filter(is_deleted=True).filter(
+            Exists(GoalCategory.objects.filter(board=OuterRef('pk'), is_deleted=False))
+            | Exists(Goal.objects.filter(board=OuterRef('pk')).exclude(status=Goal.Status.archived))
+        )
+        if board_ids:
+            boards = boards.filter(id__in=board_ids)
+        return list(boards.order_by('id').values_list('id', flat=True))
+
+    def archive_board(self, board_id: int, chunk_size: int, pause: float) -> None:
+        goals = Goal.objects.filter(board_id=board_id).exclude(status=Goal.Status.archived)
+        categories = GoalCategory.objects.filter(board_id=board_id, is_deleted=False)
+        total_goals, total_categories = goals.count(), categories.count()
+        if not total_goals and not total_categories:
+            return
+        self.stdout.write(f'Доска {board_id}: целей {total_goals}, категорий {total_categories}')
+
+        # сначала цели: пока категория не удалена, по ней находятся её неархивные цели
+        done = self.update_in_chunks(goals, {'status': Goal.Status.archived}, chunk_size, pause,
+                                     lambda count: self.stdout.write(f'  цели: {count}/{total_goals}'),
+                                     before_update=self.archive_goal_stats)
+        done += self.update_in_chunks(categories, {'is_deleted': True}, chunk_size, pause,
+                                      lambda count: self.stdout.write(f'  категории: {count}/{total_categories}'))
+        # update() не отправляет сигналы: сводку (в update_in_chunks) и кеш ответов обновляем сами
+        response_cache.bump(board_id)
+        self.stdout.write(self.style.SUCCESS(f'Доска {board_id}: обработано {done}'))
+
+    @staticmethod
+    def archive_goal_stats(ids: list[int]) -> None:
+        deltas = Counter()
+        # блокируем порцию до update, чтобы статус не поменялся между чтением и архивацией
+        for category_id, status, priority in Goal.objects.select_for_update().filter(id__in=ids).exclude(
+            status=Goal.Status.archived,
+        ).values_list('category_id', 'status', 'priority'):
+            deltas[category_id, status, priority] -= 1
+            deltas[category_id, Goal.Status.archived, priority] += 1
+        stats.apply(deltas)
+
+    @staticmethod
+    def update_in_chunks(queryset, values: dict, chunk_size: int, pause: float, report, before_update=None) -> int:
+        done = 0
+        while ids := list(queryset.order_by('id').values_list('id', flat=True)[:chunk_size]):
+            # короткая транзакция на порцию: блокировки держатся на chunk_size строк, не на всю доску
+            with transaction.atomic():
+                if before_update:
+                    before_update(ids)
+                done += queryset.model.objects.filter(id__in=ids).update(updated=timezone.now(), **values)
+            report(done)
+            if pause:
+                time.sleep(pause)
+        return done
@@ -0,0 +1,79 @@
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from core.models import User
+from goals.views import board, category, comment, goal
+
+VIEWS = (
+    ('goal/list', goal.GoalListView, False),
+    ('goal/<pk>', goal.GoalView, True),
+    ('goal_category/list', category.GoalCategoryListView, False),
+    ('goal_category/<pk>', category.GoalCategoryView, True),
+    ('goal_comment/list', comment.GoalCommentListView, False),
+    ('goal_comment/<pk>', comment.GoalCommentView, True),
+    ('board/list', board.BoardListView, False),
+    ('board/<pk>', board.BoardView, True),
+)
+
+SEQ_SCAN_RE = re.compile(r'Seq Scan on (\w+)|\bSCAN (?:TABLE )?(\w+)')
+# списки больших таблиц, у которых есть индекс в порядке сортировки: для них сортировка отдельным шагом — замечание
+ORDERED_LISTS = ('goal/list', 'goal_comment/list')
+# ORDER BY списка отдельным шагом: узел Sort по столбцам таблицы в PostgreSQL, временное B-дерево в SQLite
+ORDER_SORT_RE = r'Sort Key: {table}\.|USE TEMP B-TREE FOR (?:.* )?ORDER BY'
+
+
+class Command(BaseCommand):
+    help = 'Выполняет EXPLAIN для queryset каждого view из goals и показывает, какие индексы используются'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Пользователь, от имени которого строятся queryset')
+        parser.add_argument('--limit', type=int, default=100, help='Размер страницы для списков')
+        parser.add_argument('--analyze', action='store_true', help='EXPLAIN ANALYZE (только PostgreSQL)')
+        parser.add_argument('--verbose-plan', action='store_true', help='Печатать план целиком')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["username"]} не найден')
+
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError('--analyze поддерживается только на PostgreSQL')
+            explain_options['analyze'] = True
+
+        index_names = {index.name for model in apps.get_app_config('goals').get_models()
+                       for index in model._meta.indexes}
+
+        for route, view_class, is_detail in VIEWS:
+            queryset = self.get_queryset(view_class, user)
+            queryset = queryset.filter(pk=0) if is_detail else queryset[:options['limit']]
+            plan = queryset.explain(**explain_options)
+
+            used = sorted(name for name in index_names if name in plan)
+            seq_scans = sorted({next(filter(None, match)) for match in SEQ_SCAN_RE.findall(plan)})
+            sorts = route in ORDERED_LISTS and re.search(ORDER_SORT_RE.format(table=queryset.model._meta.db_table), plan)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(route))
+            self.stdout.write(f'  индексы goals: {", ".join(used) or "—"}')
+            if seq_scans:
+                self.stdout.write(self.style.WARNING(f'  полный просмотр: {", ".join(seq_scans)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS('  полных просмотров нет'))
+            if sorts:
+                self.stdout.write(self.style.WARNING('  сортировка без индекса: строки упорядочиваются после выборки'))
+            if options['verbose_plan']:
+                self.stdout.write(plan)
+
+    @staticmethod
+    def get_queryset(view_class, user):
+        view = view_class()
+        view.request = view.initialize_request(APIRequestFactory().get('/'))
+        view.request.user = user
+        view.args, view.kwargs, view.format_kwarg = (), {}, None
+        return view.filter_queryset(view.get_queryset())
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import User
+from goals.importer import FORMATS, GoalImporter, detect_format, iter_records
+
+
+class Command(BaseCommand):
+    help = '''Импортирует цели из CSV или NDJSON от имени пользователя: те же проверки, что у goal/import.
+Колонки: title, category, description, status, priority, due_date. Файл читается потоком.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='Имя пользователя-автора целей')
+        parser.add_argument('--input', choices=FORMATS, help='Формат файла, по умолчанию — по расширению')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Строк в одной транзакции')
+        parser.add_argument('--no-copy', action='store_true', help='Не использовать COPY в PostgreSQL')
+        parser.add_argument('--after-line', type=int, default=0,
+                            help='Пропустить строки файла до этой включительно (продолжение прерванного импорта)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["user"]} не найден')
+        input_format = options['input'] or detect_format(options['path'])
+        if input_format is None:
+            raise CommandError('Не удалось определить формат, укажите --input')
+
+        importer = GoalImporter(user, batch_size=options['batch_size'], use_copy=False if options['no_copy'] else None)
+        with open(options['path'], 'rb') as file:
+            result = importer.run(iter_records(file, input_format), after_line=options['after_line'])
+
+        for error in result.errors:
+            self.stderr.write(f'строка {error["line"]}: {error["errors"]}')
+        if result.failed > len(result.errors):
+            self.stderr.write(f'... и ещё {result.failed - len(result.errors)} ошибок')
+        if not result.complete:
+            raise CommandError(f'{result.detail}. Создано {result.created}, записано до строки {result.last_line}; '
+                               f'продолжить: --after-line {result.last_line}')
+        self.stdout.write(self.style.SUCCESS(f'Создано {result.created}, с ошибками {result.failed}'))
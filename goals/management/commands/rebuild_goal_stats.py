@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from goals import stats
+
+
+class Command(BaseCommand):
+    help = '''Пересчитывает сводку статистики досок по целям.
+Нужна после прямых изменений в базе в обход приложения или для проверки расхождений.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, action='append', help='Пересчитать только эти доски')
+
+    def handle(self, *args, **options):
+        rows = stats.rebuild(options['board'])
+        self.stdout.write(self.style.SUCCESS(f'Сводка пересчитана: {rows} строк'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from goals import response_cache
+from goals.checks import is_process_local
+
+
+class Command(BaseCommand):
+    help = 'Показывает число попаданий и промахов кеша ответов списков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Обнулить счётчики')
+
+    def handle(self, *args, **options):
+        if is_process_local():
+            # счётчики в памяти процесса: команда увидела бы только свои, то есть нули
+            raise CommandError('Кеш Django хранится в памяти процесса, счётчики воркеров отсюда не видны')
+        stats = response_cache.stats()
+        total = stats['hit'] + stats['miss']
+        ratio = stats['hit'] / total * 100 if total else 0
+        self.stdout.write(f'Попаданий: {stats["hit"]}, промахов: {stats["miss"]}, доля попаданий: {ratio:.1f}%')
+        if options['reset']:
+            response_cache.reset_stats()
@@ -0,0 +1,92 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from goals.models import BoardParticipant, Goal
+from goals.seed import SeedPlan, seed
+
+
+def parse_weights(value: str, choices) -> dict[int, float]:
+    """'done:1,to_do:3' или '4:1,1:3' → {значение: вес}."""
+    names = {choice.name: choice.value for choice in choices}
+    weights = {}
+    for item in value.split(','):
+        key, _, weight = item.partition(':')
+        key = key.strip()
+        if key in names:
+            key = names[key]
+        elif key.isdigit() and int(key) in names.values():
+            key = int(key)
+        else:
+            raise CommandError(f'Неизвестное значение {key!r}, допустимы: {", ".join(names)}')
+        try:
+            weights[key] = float(weight)
+        except ValueError:
+            raise CommandError(f'Некорректный вес в {item!r}')
+    return weights
+
+
+class Command(BaseCommand):
+    help = '''Заполняет базу тестовыми данными: пользователи, доски с участниками разных ролей, категории,
+цели с перекошенными распределениями статусов, приоритетов и дедлайнов, комментарии.
+Вставка идёт порциями через bulk_create, в PostgreSQL цели и комментарии грузятся через COPY.
+Пример: seed_todolist --goals 1000000 --board-skew 2 --status-weights to_do:5,in_progress:2,done:2,archived:1'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--goals', type=int, default=10000, help='Число целей')
+        parser.add_argument('--users', type=int, help='Число пользователей (по умолчанию goals / 200)')
+        parser.add_argument('--boards', type=int, help='Число досок (по умолчанию goals / 500)')
+        parser.add_argument('--participants-per-board', type=int, default=4, help='Участников на доску, включая владельца')
+        parser.add_argument('--categories-per-board', type=int, default=4)
+        parser.add_argument('--comments-per-goal', type=float, default=0.5, help='Среднее число комментариев на цель')
+        parser.add_argument('--board-skew', type=float, default=0.0,
+                            help='Перекос целей по доскам: 0 — равномерно, 2 — большая часть на первых досках')
+        parser.add_argument('--comment-skew', type=float, default=0.0, help='Перекос комментариев по целям')
+        parser.add_argument('--status-weights', default='to_do:1,in_progress:1,done:1,archived:1')
+        parser.add_argument('--priority-weights', default='low:1,medium:1,high:1,critical:1')
+        parser.add_argument('--role-weights', default='writer:1,reader:1', help='Роли участников, кроме владельца')
+        parser.add_argument('--due-ratio', type=float, default=0.7, help='Доля целей с дедлайном')
+        parser.add_argument('--overdue-ratio', type=float, default=0.3, help='Доля просроченных среди целей с дедлайном')
+        parser.add_argument('--due-horizon', type=int, default=90, help='Дедлайны не дальше стольких дней вперёд')
+        parser.add_argument('--seed', type=int, default=0, help='Зерно генератора: одинаковые параметры дают одинаковые данные')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Строк в одной вставке')
+        parser.add_argument('--prefix', default='seed', help='Префикс имён пользователей')
+        parser.add_argument('--password', default='seed-password', help='Пароль всех пользователей')
+        parser.add_argument('--no-copy', action='store_true', help='Не использовать COPY в PostgreSQL')
+
+    def handle(self, *args, **options):
+        role_weights = parse_weights(options['role_weights'], BoardParticipant.Role)
+        if BoardParticipant.Role.owner in role_weights:
+            raise CommandError('Владелец у каждой доски один, его не нужно указывать в --role-weights')
+        plan = SeedPlan(
+            goals=options['goals'],
+            users=options['users'],
+            boards=options['boards'],
+            participants_per_board=options['participants_per_board'],
+            categories_per_board=options['categories_per_board'],
+            comments_per_goal=options['comments_per_goal'],
+            board_skew=options['board_skew'],
+            comment_skew=options['comment_skew'],
+            status_weights=parse_weights(options['status_weights'], Goal.Status),
+            priority_weights=parse_weights(options['priority_weights'], Goal.Priority),
+            role_weights=role_weights,
+            due_ratio=options['due_ratio'],
+            overdue_ratio=options['overdue_ratio'],
+            due_horizon_days=options['due_horizon'],
+            password=options['password'],
+            seed=options['seed'],
+        )
+        if plan.categories_per_board < 1 or plan.participants_per_board < 1:
+            raise CommandError('На доске нужны хотя бы одна категория и один участник')
+
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        self.stdout.write(f'{connection.vendor}, вставка через {"COPY" if use_copy else "bulk_create"}')
+        started = time.perf_counter()
+        result = seed(plan, batch_size=options['batch_size'], prefix=options['prefix'], use_copy=use_copy,
+                      report=lambda message: self.stdout.write(f'  {message}'))
+        elapsed = time.perf_counter() - started
+        rows = sum(result.counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.counts} за {elapsed:.1f} с ({rows / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+
+from goals.models import BoardParticipant
+
+CACHE_KEY = 'goals:board_roles:{user_id}'
+
+WRITE_ROLES = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+
+class BoardMembership:
+    """Роли пользователя на неудалённых досках: карта board_id -> role, загружается один раз."""
+
+    def __init__(self, user_id: int | None):
+        self.user_id = user_id
+        self._roles: dict[int, int] | None = None
+
+    @property
+    def roles(self) -> dict[int, int]:
+        if self._roles is None:
+            self._roles = load_roles(self.user_id)
+        return self._roles
+
+    def role(self, board_id: int) -> int | None:
+        return self.roles.get(board_id)
+
+    def can_read(self, board_id: int) -> bool:
+        return board_id in self.roles
+
+    def can_write(self, board_id: int) -> bool:
+        return self.role(board_id) in WRITE_ROLES
+
+    def is_owner(self, board_id: int) -> bool:
+        return self.role(board_id) == BoardParticipant.Role.owner
+
+
+def load_roles(user_id: int | None) -> dict[int, int]:
+    """
+    Роли из общего кеша на MEMBERSHIP_CACHE_TIMEOUT секунд. Кеш должен быть общим для всех
+    процессов (см. goals.checks): сброс после изменения участников в памяти одного воркера
+    не дошёл бы до остальных. При 0 роли живут только в BoardMembership текущего запроса.
+    """
+    if user_id is None:
+        return {}
+    timeout = settings.MEMBERSHIP_CACHE_TIMEOUT
+    if not timeout:
+        return query_roles(user_id)
+    key = CACHE_KEY.format(user_id=user_id)
+    roles = cache.get(key)
+    if roles is None:
+        roles = query_roles(user_id)
+        cache.set(key, roles, timeout)
+    return roles
+
+
+def query_roles(user_id: int) -> dict[int, int]:
+    return dict(
+        BoardParticipant.objects.filter(user_id=user_id, board__is_deleted=False).values_list('board_id', 'role')
+    )
+
+
+def invalidate(*user_ids: int) -> None:
+    # сбрасываем сразу и после коммита: параллельный запрос мог успеть
+    # закешировать роли до фиксации транзакции
+    keys = [CACHE_KEY.format(user_id=user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def member_boards(user_id: int | None) -> QuerySet:
+    """
+    Подзапрос id неудалённых досок пользователя для фильтра board_id__in. Некоррелированный:
+    SQLite выполняет его один раз (коррелированный EXISTS — на каждую строку),
+    PostgreSQL планирует его так же, как EXISTS, — полусоединением.
+    """
+    return BoardParticipant.objects.filter(user_id=user_id, board__is_deleted=False).values('board_id')
+
+
+def get_membership(request) -> BoardMembership:
+    # DRF Request оборачивает HttpRequest: храним на исходном, чтобы сериализаторы,
+    # permissions и middleware видели один и тот же объект
+    http_request = getattr(request, '_request', request)
+    membership = getattr(http_request, '_board_membership', None)
+    if membership is None:
+        membership = BoardMembership(user_id=request.user.id)
+        http_request._board_membership = membership
+    return membership
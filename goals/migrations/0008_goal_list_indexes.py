@@ -0,0 +1,37 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+from goals.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # таблицы целей и комментариев большие: индексы строятся CONCURRENTLY, вне транзакции
+    atomic = False
+
+    dependencies = [
+        ('goals', '0007_alter_goalcategory_board'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='boardparticipant',
+            index=models.Index(fields=['user', 'board', 'role'], name='boardparticipant_user_role_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['category', 'due_date', '-priority', 'id'], name='goal_category_active_due_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['due_date', '-priority', 'id'], name='goal_active_due_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board', 'title'], name='goalcategory_board_active_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goalcomment',
+            index=models.Index(fields=['goal', '-created'], name='goalcomment_goal_created_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+# Выражение должно совпадать с goals.search.goal_search_vector
+SEARCH_CONFIG = 'russian'
+GIN_INDEX_NAME = 'goal_search_vector_idx'
+
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE goals_goal_fts USING fts5("
+    "title, description, content='goals_goal', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER goals_goal_fts_ai AFTER INSERT ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER goals_goal_fts_ad AFTER DELETE ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER goals_goal_fts_au AFTER UPDATE OF title, description ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO goals_goal_fts(goals_goal_fts) VALUES ('rebuild')",
+)
+
+SQLITE_BACKWARD = (
+    "DROP TRIGGER IF EXISTS goals_goal_fts_ai",
+    "DROP TRIGGER IF EXISTS goals_goal_fts_ad",
+    "DROP TRIGGER IF EXISTS goals_goal_fts_au",
+    "DROP TABLE IF EXISTS goals_goal_fts",
+)
+
+
+def gin_index() -> GinIndex:
+    vector = (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+    return GinIndex(vector, name=GIN_INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    # Индекс не объявлен в Goal.Meta: GIN и FTS5 есть только у своих СУБД,
+    # а миграции должны применяться и на PostgreSQL, и на локальном SQLite
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # CONCURRENTLY: пока строится индекс, запись в таблицу целей не блокируется
+        schema_editor.add_index(apps.get_model('goals', 'Goal'), gin_index(), concurrently=True)
+    elif vendor == 'sqlite':
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('goals', 'Goal'), gin_index(), concurrently=True)
+    elif vendor == 'sqlite':
+        for sql in SQLITE_BACKWARD:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0008_goal_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        # Модель над таблицей FTS5 для JOIN в GoalSearchFilter; таблицу создаёт RunPython выше
+        migrations.CreateModel(
+            name='GoalSearchIndex',
+            fields=[
+                ('goal', models.OneToOneField(db_column='rowid', on_delete=models.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='goals.goal')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'goals_goal_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0009_goal_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['updated'], name='goal_updated_idx'),
+        ),
+    ]
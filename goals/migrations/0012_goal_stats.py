@@ -0,0 +1,51 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_goal_stats(apps, schema_editor):
+    Goal = apps.get_model('goals', 'Goal')
+    GoalStat = apps.get_model('goals', 'GoalStat')
+    rows = Goal.objects.values('category_id', 'category__board_id', 'status', 'priority').annotate(
+        count=models.Count('id'),
+    ).order_by()
+    GoalStat.objects.bulk_create([
+        GoalStat(board_id=row['category__board_id'], category_id=row['category_id'],
+                 status=row['status'], priority=row['priority'], count=row['count'])
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_goal_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('count', models.IntegerField(default=0, verbose_name='Число целей')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goal_stats', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Статистика целей',
+                'verbose_name_plural': 'Статистика целей',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='goalstat',
+            index=models.Index(fields=['board'], name='goalstat_board_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='goalstat',
+            constraint=models.UniqueConstraint(fields=('category', 'status', 'priority'), name='goalstat_key_uniq'),
+        ),
+        migrations.RunPython(fill_goal_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Откат AddField в SQLite пересоздаёт таблицу goals_goal, при этом пропадают
+# триггеры FTS5 из 0009: после отката создаём их заново (то же делает 0015)
+SQLITE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_ai AFTER INSERT ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_ad AFTER DELETE ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_au AFTER UPDATE OF title, description ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    """
+    Поля добавляются допускающими NULL и без индекса: заполняет их 0014, ограничение NOT NULL
+    и индексы (CONCURRENTLY в PostgreSQL) ставит 0015.
+    """
+
+    dependencies = [
+        ('goals', '0012_goal_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_search_triggers),
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+    ]
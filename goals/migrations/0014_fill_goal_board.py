@@ -0,0 +1,41 @@
+from django.db import migrations, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+BATCH_SIZE = 10_000
+
+
+def update_in_batches(model, board_id) -> None:
+    """
+    UPDATE по диапазонам первичного ключа, каждый диапазон в своей транзакции: блокировки
+    держатся на BATCH_SIZE строк, а не на всю таблицу. Заполненные строки пропускаются,
+    поэтому прерванную миграцию можно запустить повторно.
+    """
+    max_id = model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        with transaction.atomic():
+            model.objects.filter(id__gte=start, id__lt=start + BATCH_SIZE, board_id__isnull=True).update(
+                board_id=board_id,
+            )
+
+
+def fill_board(apps, schema_editor):
+    Goal = apps.get_model('goals', 'Goal')
+    GoalCategory = apps.get_model('goals', 'GoalCategory')
+    GoalComment = apps.get_model('goals', 'GoalComment')
+    # коррелированный подзапрос по первичному ключу; комментарии — после целей, доска берётся у цели
+    update_in_batches(Goal, Subquery(GoalCategory.objects.filter(pk=OuterRef('category_id')).values('board_id')[:1]))
+    update_in_batches(GoalComment, Subquery(Goal.objects.filter(pk=OuterRef('goal_id')).values('board_id')[:1]))
+
+
+class Migration(migrations.Migration):
+    # отдельная миграция: в PostgreSQL ALTER TABLE нельзя выполнить в одной транзакции
+    # с UPDATE внешнего ключа (pending trigger events); порции фиксируются по отдельности
+    atomic = False
+
+    dependencies = [
+        ('goals', '0013_goal_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_board, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+from goals.operations import AddIndexConcurrentlyOnPostgres, SetNotNullOnPostgres
+
+# SQLite меняет NOT NULL пересозданием таблицы goals_goal, при этом пропадают
+# триггеры FTS5 из 0009: создаём их заново (после изменения и после отката)
+SQLITE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_ai AFTER INSERT ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_ad AFTER DELETE ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_au AFTER UPDATE OF title, description ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    # NOT NULL через проверенный CHECK и индекс CONCURRENTLY — без долгих блокировок записи в PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('goals', '0014_fill_goal_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_search_triggers),
+        SetNotNullOnPostgres(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        SetNotNullOnPostgres(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.RunPython(create_search_triggers, migrations.RunPython.noop),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goalcomment',
+            index=models.Index(fields=['board', '-created'], name='goalcomment_board_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(fields=['board'], name='goal_board_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'due_date', '-priority', 'id'], name='goal_board_active_due_idx'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import NotSupportedError, connections, models, transaction
 from django.utils import timezone
 
 from core.models import User
@@ -31,6 +31,10 @@ class GoalCategory(DatesModel):
     class Meta:
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
+        indexes = [
+            models.Index(fields=['board', 'title'], condition=models.Q(is_deleted=False),
+                         name='goalcategory_board_active_idx'),
+        ]
 
     title = models.CharField(verbose_name='Название', max_length=255)
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
@@ -59,10 +63,29 @@ class Goal(DatesModel):
     class Meta:
         verbose_name = 'Цель'
         verbose_name_plural = 'Цели'
+        indexes = [
+            # status=4 — Goal.Status.archived: из тела Meta атрибуты Goal недоступны
+            # список целей: board_id IN (доски участника) ORDER BY due_date, -priority, id
+            models.Index(fields=['board', 'due_date', '-priority', 'id'], condition=~models.Q(status=4),
+                         name='goal_board_active_due_idx'),
+            # список с фильтром ?category=
+            models.Index(fields=['category', 'due_date', '-priority', 'id'], condition=~models.Q(status=4),
+                         name='goal_category_active_due_idx'),
+            # диапазон дедлайнов по всем доскам (напоминания bot.reminders)
+            models.Index(fields=['due_date', '-priority', 'id'], condition=~models.Q(status=4),
+                         name='goal_active_due_idx'),
+            # индекс внешнего ключа board: строится CONCURRENTLY в 0015, а не вместе со столбцом в 0013
+            models.Index(fields=['board'], name='goal_board_idx'),
+            # инкрементальная выборка изменённых целей (напоминания о дедлайнах)
+            models.Index(fields=['updated'], name='goal_updated_idx'),
+        ]
 
     title = models.CharField(verbose_name='Название', max_length=255)
     user = models.ForeignKey(User, on_delete=models.PROTECT, verbose_name='Автор')
     category = models.ForeignKey(GoalCategory, on_delete=models.CASCADE, verbose_name='Категория')
+    # копия category.board: проверка доступа без join через категорию; заполняется сигналом pre_save
+    board = models.ForeignKey(Board, on_delete=models.PROTECT, verbose_name='Доска', related_name='goals',
+                              db_index=False)
     description = models.TextField(null=True, blank=True, verbose_name='Описание')
     status = models.PositiveSmallIntegerField(choices=Status.choices, default=Status.to_do, verbose_name='Статус')
     priority = models.PositiveSmallIntegerField(choices=Priority.choices, default=Priority.low,
@@ -72,13 +95,52 @@ class Goal(DatesModel):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # сводку GoalStat меняют сигналы pre/post_save: цель и сводка фиксируются вместе или никак
+        # (delete уже атомарен: Collector шлёт post_delete внутри своей транзакции)
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().save(*args, **kwargs)
+
+
+class SqliteOnlyManager(models.Manager):
+    """Для таблиц, которые миграции создают только в SQLite: на другой СУБД запрос — ошибка в коде."""
+
+    def get_queryset(self):
+        if connections[self.db].vendor != 'sqlite':
+            raise NotSupportedError(f'{self.model.__name__} есть только в SQLite')
+        return super().get_queryset()
+
+
+class GoalSearchIndex(models.Model):
+    """
+    Виртуальная таблица FTS5 из миграции 0009 (есть только в SQLite): rowid — id цели, rank — bm25.
+    Используется только как JOIN в goals.search.GoalSearchFilter.filter_sqlite.
+    """
+
+    objects = SqliteOnlyManager()
+
+    class Meta:
+        managed = False
+        db_table = 'goals_goal_fts'
+
+    goal = models.OneToOneField(Goal, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING,
+                                related_name='search_index')
+    rank = models.FloatField()
+
 
 class GoalComment(DatesModel):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Коментарии'
+        indexes = [
+            models.Index(fields=['goal', '-created'], name='goalcomment_goal_created_idx'),
+            models.Index(fields=['board', '-created'], name='goalcomment_board_created_idx'),
+        ]
 
     goal = models.ForeignKey(Goal, on_delete=models.CASCADE, verbose_name='Цель')
+    # копия goal.board; отдельный индекс по FK не нужен — его покрывает goalcomment_board_created_idx
+    board = models.ForeignKey(Board, on_delete=models.PROTECT, verbose_name='Доска', related_name='comments',
+                              db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Автор')
     text = models.TextField(verbose_name='Комментарий')
 
@@ -91,6 +153,9 @@ class BoardParticipant(DatesModel):
         unique_together = ("board", "user")
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
+        indexes = [
+            models.Index(fields=["user", "board", "role"], name="boardparticipant_user_role_idx"),
+        ]
 
     class Role(models.IntegerChoices):
         owner = 1, "Владелец"
@@ -112,3 +177,26 @@ class BoardParticipant(DatesModel):
     role = models.PositiveSmallIntegerField(
         verbose_name="Роль", choices=Role.choices, default=Role.owner
     )
+
+
+class GoalStat(models.Model):
+    """
+    Сводка для статистики доски: число целей на (категория, статус, приоритет).
+    Поддерживается инкрементально (goals.stats), пересчитывается командой rebuild_goal_stats.
+    """
+
+    class Meta:
+        verbose_name = 'Статистика целей'
+        verbose_name_plural = 'Статистика целей'
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'status', 'priority'], name='goalstat_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['board'], name='goalstat_board_idx'),
+        ]
+
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, verbose_name='Доска', related_name='goal_stats')
+    category = models.ForeignKey(GoalCategory, on_delete=models.CASCADE, verbose_name='Категория')
+    status = models.PositiveSmallIntegerField(choices=Goal.Status.choices, verbose_name='Статус')
+    priority = models.PositiveSmallIntegerField(choices=Goal.Priority.choices, verbose_name='Приоритет')
+    count = models.IntegerField(default=0, verbose_name='Число целей')
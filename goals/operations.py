@@ -0,0 +1,50 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations import AddIndex, AlterField
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY в PostgreSQL: индекс строится без блокировки записи в таблицу.
+    На остальных СУБД — обычный AddIndex. Миграция с этой операцией должна быть atomic = False.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class SetNotNullOnPostgres(AlterField):
+    """
+    AlterField, делающий столбец NOT NULL. В PostgreSQL — через CHECK (столбец IS NOT NULL) NOT VALID:
+    VALIDATE проверяет строки, не блокируя запись, а SET NOT NULL (PostgreSQL 12+) опирается на
+    проверенное ограничение и таблицу не сканирует; затем CHECK удаляется. На остальных СУБД —
+    обычный AlterField. Миграция с этой операцией должна быть atomic = False.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+            return
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        quote = schema_editor.quote_name
+        table = quote(model._meta.db_table)
+        column = model._meta.get_field(self.name).column
+        constraint = quote(f'{model._meta.db_table}_{column}_not_null')
+        # после неудачного VALIDATE (остались NULL) ограничение остаётся: повторный запуск начинает заново
+        schema_editor.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}')
+        schema_editor.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({quote(column)} IS NOT NULL) NOT VALID'
+        )
+        schema_editor.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+        schema_editor.execute(f'ALTER TABLE {table} ALTER COLUMN {quote(column)} SET NOT NULL')
+        schema_editor.execute(f'ALTER TABLE {table} DROP CONSTRAINT {constraint}')
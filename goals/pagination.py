@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу: вместо OFFSET и COUNT(*) страница начинается строго после
+    значений полей сортировки последней строки предыдущей страницы.
+    Сортировка берётся из queryset (view.ordering / OrderingFilter), id добавляется
+    в конец для однозначного порядка. NULL стоят там же, где их ставит СУБД без курсора
+    (PostgreSQL считает NULL наибольшим значением, SQLite — наименьшим), поэтому порядок
+    не зависит от ?pagination= и совпадает с порядком индексов.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 100
+    max_limit = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.fields = self.get_ordering(queryset, view)
+        self.model = queryset.model
+        self.nulls_largest = connections[queryset.db].features.nulls_order_largest
+
+        values, self.is_reverse = self.decode_cursor(request, queryset.model)
+        if values is not None:
+            queryset = queryset.filter(self.build_filter(queryset.model, values, self.is_reverse))
+        queryset = queryset.order_by(*self.build_order_by(queryset.model, self.is_reverse))
+
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.is_reverse:
+            rows.reverse()
+
+        if self.is_reverse:
+            self.has_next, self.has_previous = values is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request) -> int:
+        try:
+            return _positive_int(request.query_params[self.limit_query_param], strict=True, cutoff=self.max_limit)
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_ordering(self, queryset, view) -> list[tuple[str, bool]]:
+        ordering = list(queryset.query.order_by) or list(getattr(view, 'ordering', None) or [])
+        fields: list[tuple[str, bool]] = []
+        for item in ordering:
+            if not isinstance(item, str):
+                raise TypeError('KeysetPagination supports only field name ordering')
+            descending = item.startswith('-')
+            name = item.lstrip('-')
+            fields.append(('id' if name == 'pk' else name, descending))
+        if 'id' not in (name for name, _ in fields):
+            fields.append(('id', False))
+        return fields
+
+    def build_order_by(self, model, is_reverse: bool) -> list:
+        # место NULL не задаётся: оно то же, что у СУБД в режиме LimitOffset
+        return [F(name).desc() if descending != is_reverse else F(name).asc() for name, descending in self.fields]
+
+    def build_filter(self, model, values: list, is_reverse: bool) -> Q:
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            nullable = self.is_nullable(model, name)
+            condition |= equal & self.after(name, descending, value, is_reverse, nullable)
+            equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return condition
+
+    def after(self, name: str, descending: bool, value, is_reverse: bool, nullable: bool) -> Q:
+        ascending = descending == is_reverse
+        # при обходе по возрастанию NULL идут после всех значений, если СУБД считает их наибольшими
+        nulls_after = ascending == self.nulls_largest
+        if value is None:
+            return Q(pk__in=[]) if nulls_after else Q(**{f'{name}__isnull': False})
+        condition = Q(**{f'{name}__{"gt" if ascending else "lt"}': value})
+        if nullable and nulls_after:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def is_nullable(self, model, name: str) -> bool:
+        field = self.get_field(model, name)
+        return field is not None and field.null
+
+    @staticmethod
+    def get_field(model, name: str):
+        # сортировка может идти по аннотации (например, search_rank), а не по полю модели
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    def row_values(self, row) -> list:
+        # строка — экземпляр модели или словарь из .values() (быстрый путь сериализации)
+        model = self.model
+        values = []
+        for name, _ in self.fields:
+            field = self.get_field(model, name)
+            key = field.attname if field else name
+            values.append(row[key] if isinstance(row, dict) else getattr(row, key))
+        return values
+
+    def encode_cursor(self, row, is_reverse: bool) -> str:
+        # isoformat, а не DjangoJSONEncoder: тот обрезает микросекунды, и курсор
+        # перестаёт совпадать со значением в базе
+        values = [value.isoformat() if isinstance(value, date) else value for value in self.row_values(row)]
+        payload = json.dumps({'v': values, 'r': is_reverse})
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model) -> tuple[list | None, bool]:
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            raw_values = payload['v']
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = []
+            for (name, _), value in zip(self.fields, raw_values):
+                field = self.get_field(model, name)
+                values.append(field.to_python(value) if field and value is not None else value)
+            return values, bool(payload.get('r'))
+        except (TypeError, KeyError, ValueError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        if self.last_row is None:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.last_row, is_reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.first_row, is_reverse=True)
+
+
+class LimitOffsetOrKeysetPagination(LimitOffsetPagination):
+    """
+    LimitOffset по умолчанию; keyset-режим включается параметром ?pagination=cursor
+    (первая страница) или переданным ?cursor=... (следующие страницы).
+    """
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.keyset: KeysetPagination | None = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if params.get(self.mode_query_param) == 'cursor' or self.keyset_class.cursor_query_param in params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
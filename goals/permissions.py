@@ -1,6 +1,7 @@
 from rest_framework import permissions
 
-from goals.models import BoardParticipant, Board, Goal, GoalCategory
+from goals.membership import get_membership
+from goals.models import Board, Goal, GoalCategory
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -12,23 +13,23 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 
 class BoardPermissions(permissions.IsAuthenticated):
     def has_object_permission(self, request, view, obj: Board):
-        _filters: dict = {'user': request.user, 'board': obj}
-        if request.method not in permissions.SAFE_METHODS:
-            _filters['role'] = BoardParticipant.Role.owner
-        return BoardParticipant.objects.filter(**_filters).exists()
+        membership = get_membership(request)
+        if request.method in permissions.SAFE_METHODS:
+            return membership.can_read(obj.id)
+        return membership.is_owner(obj.id)
 
 
 class CategoryPermissions(permissions.IsAuthenticated):
     def has_object_permission(self, request, view, obj: GoalCategory):
-        _filters: dict = {'user': request.user, 'board': obj.board}
-        if request.method not in permissions.SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        return BoardParticipant.objects.filter(**_filters).exists()
+        membership = get_membership(request)
+        if request.method in permissions.SAFE_METHODS:
+            return membership.can_read(obj.board_id)
+        return membership.can_write(obj.board_id)
 
 
 class GoalBoardPermissions(permissions.IsAuthenticated):
     def has_object_permission(self, request, view, obj: Goal):
-        _filters: dict = {'user': request.user, 'board': obj.category.board}
-        if request.method not in permissions.SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        return BoardParticipant.objects.filter(**_filters).exists()
+        membership = get_membership(request)
+        if request.method in permissions.SAFE_METHODS:
+            return membership.can_read(obj.board_id)
+        return membership.can_write(obj.board_id)
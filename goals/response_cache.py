@@ -0,0 +1,107 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from goals.membership import get_membership
+
+GENERATION_KEY = 'goals:board_gen:{board_id}'
+RESPONSE_KEY = 'goals:response:{digest}'
+STATS_KEYS = {'hit': 'goals:response_cache:hits', 'miss': 'goals:response_cache:misses'}
+
+
+def get_generations(board_ids) -> dict[int, int]:
+    keys = {GENERATION_KEY.format(board_id=board_id): board_id for board_id in board_ids}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        # после вытеснения из кеша поколение начинается не с нуля, а со случайного
+        # значения, иначе могли бы снова совпасть ключи старых ответов
+        for key, value in missing.items():
+            if not cache.add(key, value, None):
+                value = cache.get(key, value)
+            found[key] = value
+    return {keys[key]: value for key, value in found.items()}
+
+
+def bump(*board_ids: int) -> None:
+    """Новое поколение досок: закешированные по ним ответы больше не выбираются."""
+    board_ids = {board_id for board_id in board_ids if board_id is not None}
+    if not board_ids:
+        return
+
+    def _bump():
+        for board_id in board_ids:
+            key = GENERATION_KEY.format(board_id=board_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), None)
+
+    # сразу и после коммита: параллельный запрос мог успеть закешировать данные до фиксации транзакции
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def stats() -> dict[str, int]:
+    values = cache.get_many(STATS_KEYS.values())
+    return {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+def reset_stats() -> None:
+    cache.delete_many(STATS_KEYS.values())
+
+
+def _count(name: str) -> None:
+    key = STATS_KEYS[name]
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+class CachedListMixin:
+    """
+    Кеш ответа списка: ключ — пользователь, view, нормализованные параметры запроса
+    и поколения всех досок пользователя. Запись в доску меняет её поколение (bump),
+    поэтому старые ответы просто перестают выбираться и истекают по таймауту.
+    """
+
+    def list(self, request, *args, **kwargs):
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        if not timeout:
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            _count('hit')
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        _count('miss')
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def get_response_cache_key(self, request) -> str:
+        return RESPONSE_KEY.format(digest=list_fingerprint(self, request))
+
+
+def list_fingerprint(view, request) -> str:
+    """
+    Отпечаток списка: пользователь, view, нормализованные параметры запроса и поколения
+    его досок. Общий для ключа кеша и ETag, поэтому поколения читаются один раз за запрос.
+    """
+    fingerprint = getattr(request, '_list_fingerprint', None)
+    if fingerprint is None:
+        params = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+        generations = sorted(get_generations(get_membership(request).roles).items())
+        raw = repr((request.user.id, type(view).__name__, params, generations))
+        fingerprint = request._list_fingerprint = hashlib.sha1(raw.encode()).hexdigest()
+    return fingerprint
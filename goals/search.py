@@ -0,0 +1,78 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Func, QuerySet, Value
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+# Конфигурация и веса должны совпадать с выражением GIN-индекса из миграции 0009,
+# иначе PostgreSQL не сможет использовать индекс
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'goals_goal_fts'
+
+
+def goal_search_vector() -> SearchVector:
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def fts5_query(terms: list[str]) -> str:
+    # каждое слово — отдельная фраза с поиском по префиксу, спецсимволы FTS5 экранируются
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def has_fts5_table(alias: str) -> bool:
+    connection = connections[alias]
+    if not hasattr(connection, '_goals_has_fts5'):
+        connection._goals_has_fts5 = FTS_TABLE in connection.introspection.table_names()
+    return connection._goals_has_fts5
+
+
+class Fts5Match(Func):
+    """Условие MATCH по таблице FTS5, присоединённой через Goal.search_index."""
+    template = f'{FTS_TABLE} MATCH %(expressions)s'
+    output_field = BooleanField()
+
+
+class GoalSearchFilter(filters.SearchFilter):
+    """
+    Полнотекстовый поиск по целям: tsvector + GIN в PostgreSQL, FTS5 в SQLite.
+    Результаты ранжируются, если клиент не передал свою сортировку.
+    На остальных СУБД — обычный SearchFilter по search_fields.
+    """
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset: QuerySet, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        vendor = connections[queryset.db].vendor
+        if vendor == 'postgresql':
+            queryset = self.filter_postgresql(queryset, ' '.join(terms))
+        elif vendor == 'sqlite' and has_fts5_table(queryset.db):
+            queryset = self.filter_sqlite(queryset, fts5_query(terms))
+        else:
+            return super().filter_queryset(request, queryset, view)
+
+        if request.query_params.get(filters.OrderingFilter.ordering_param):
+            return queryset
+        return queryset.order_by(f'-{self.rank_annotation}', *queryset.query.order_by)
+
+    def filter_postgresql(self, queryset: QuerySet, text: str) -> QuerySet:
+        vector = goal_search_vector()
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        # ts_rank возвращает real: без приведения к double значение из курсора не равно значению
+        # в базе, и keyset-пагинация по search_rank снова отдаёт ту же строку
+        return queryset.annotate(
+            search_vector=vector, **{self.rank_annotation: Cast(SearchRank(vector, query), FloatField())}
+        ).filter(search_vector=query)
+
+    def filter_sqlite(self, queryset: QuerySet, match: str) -> QuerySet:
+        # JOIN с таблицей FTS5: rank считается один раз на найденную строку; коррелированный
+        # подзапрос с MATCH на каждую строку выполнял полнотекстовый поиск заново и рос квадратично
+        # bm25 меньше у более релевантных строк, поэтому берём его со знаком минус
+        return queryset.filter(search_index__isnull=False).filter(Fts5Match(Value(match))).annotate(
+            **{self.rank_annotation: -F('search_index__rank')}
+        )
@@ -0,0 +1,245 @@
+import io
+import random
+from array import array
+from itertools import islice
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import User
+from goals import stats
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+
+
+@dataclass
+class SeedPlan:
+    """
+    Размеры и распределения набора данных. Если users/boards не заданы, они выводятся из числа целей.
+    Перекос *_skew — показатель степени: 0 — равномерно, чем больше, тем сильнее данные
+    собираются на первых досках/целях.
+    """
+    goals: int
+    users: int | None = None
+    boards: int | None = None
+    goals_per_board: int = 500
+    goals_per_user: int = 200
+    categories_per_board: int = 4
+    participants_per_board: int = 4
+    comments_per_goal: float = 0.5
+    board_skew: float = 0.0
+    comment_skew: float = 0.0
+    # веса по значениям Goal.Status / Goal.Priority и BoardParticipant.Role (кроме владельца)
+    status_weights: dict[int, float] = field(default_factory=lambda: {1: 1, 2: 1, 3: 1, 4: 1})
+    priority_weights: dict[int, float] = field(default_factory=lambda: {1: 1, 2: 1, 3: 1, 4: 1})
+    role_weights: dict[int, float] = field(default_factory=lambda: {2: 1, 3: 1})
+    due_ratio: float = 0.7
+    overdue_ratio: float = 0.3
+    due_horizon_days: int = 90
+    history_days: int = 365
+    password: str = 'seed-password'
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.boards is None:
+            self.boards = max(1, self.goals // self.goals_per_board)
+        if self.users is None:
+            self.users = max(self.participants_per_board, self.goals // self.goals_per_user)
+
+
+@dataclass
+class SeedResult:
+    user_ids: list[int] = field(default_factory=list)
+    board_ids: list[int] = field(default_factory=list)
+    counts: dict[str, int] = field(default_factory=dict)
+
+
+def skewed_index(rnd: random.Random, size: int, skew: float) -> int:
+    # степенное распределение без таблицы весов: годится и для десятков миллионов элементов
+    return min(size - 1, int(size * rnd.random() ** (1 + skew)))
+
+
+class BulkCreateWriter:
+    """Вставка через bulk_create порциями; id берутся из ответа базы."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+
+    def write(self, model, rows: Iterator[dict], ids: array, report: Callable[[int], None]) -> int:
+        count = 0
+        while batch := [model(**row) for row in islice(rows, self.batch_size)]:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            ids.extend(obj.id for obj in batch)
+            count += len(batch)
+            report(count)
+        return count
+
+
+def copy_rows(cursor, model, columns: list[str], rows: Iterable[dict]) -> None:
+    """COPY FROM STDIN в формате CSV (только PostgreSQL): columns — колонки таблицы, rows — словари attname -> значение."""
+    attnames = {f.column: f.attname for f in model._meta.concrete_fields}
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(copy_value(row[attnames[column]]) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f'COPY {model._meta.db_table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def copy_value(value) -> str:
+    # в CSV-режиме COPY NULL — пустое поле без кавычек, поэтому строки всегда в кавычках:
+    # иначе пустая строка (csv.writer пишет её так же, как None) загрузилась бы как NULL
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+class PostgresCopyWriter:
+    """
+    Вставка через COPY: на порядок быстрее INSERT. id назначаются заранее
+    с MAX(id) + 1, после загрузки сдвигается последовательность — только для офлайн-заполнения.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+
+    def write(self, model, rows: Iterator[dict], ids: array, report: Callable[[int], None]) -> int:
+        table = model._meta.db_table
+        columns = [f.column for f in model._meta.concrete_fields]
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}')
+            next_id = cursor.fetchone()[0] + 1
+            count = 0
+            while batch := list(islice(rows, self.batch_size)):
+                for row in batch:
+                    row['id'] = next_id
+                    ids.append(next_id)
+                    next_id += 1
+                copy_rows(cursor, model, columns, batch)
+                count += len(batch)
+                report(count)
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), GREATEST(%s, 1))", [next_id - 1])
+        return count
+
+
+def seed(plan: SeedPlan, batch_size: int = 5000, prefix: str = 'seed', use_copy: bool | None = None,
+         report: Callable[[str], None] = lambda message: None) -> SeedResult:
+    """
+    Заполняет базу: DatesModel.save и сигналы не вызываются, created/updated проставляются явно.
+    Цели и комментарии — самые большие таблицы — пишутся через COPY в PostgreSQL
+    (если use_copy не выключен) и через bulk_create в остальных СУБД.
+    """
+    rnd = random.Random(plan.seed)
+    now = timezone.now()
+    result = SeedResult()
+    if use_copy is None:
+        use_copy = connection.vendor == 'postgresql'
+    writer = (PostgresCopyWriter if use_copy else BulkCreateWriter)(batch_size)
+
+    def created_at() -> datetime:
+        return now - timedelta(seconds=rnd.random() * plan.history_days * 86400)
+
+    password = make_password(plan.password)
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [User(username=f'{prefix}_{index}', password=password, date_joined=now) for index in range(plan.users)],
+            batch_size=batch_size,
+        )
+        result.user_ids = [user.id for user in users]
+
+        boards = Board.objects.bulk_create(
+            [Board(title=f'Доска {index}', created=(created := created_at()), updated=created)
+             for index in range(plan.boards)],
+            batch_size=batch_size,
+        )
+        result.board_ids = [board.id for board in boards]
+
+        roles, role_weights = list(plan.role_weights), list(plan.role_weights.values())
+        participants, categories = [], []
+        board_members: list[list[int]] = []
+        for board in boards:
+            members = rnd.sample(result.user_ids, min(plan.participants_per_board, len(result.user_ids)))
+            board_members.append(members)
+            for position, user_id in enumerate(members):
+                role = BoardParticipant.Role.owner if position == 0 else rnd.choices(roles, role_weights)[0]
+                participants.append(BoardParticipant(board=board, user_id=user_id, role=role,
+                                                     created=board.created, updated=board.created))
+            categories.extend(
+                GoalCategory(board=board, user_id=members[0], title=f'Категория {index}',
+                             created=board.created, updated=board.created)
+                for index in range(plan.categories_per_board)
+            )
+        BoardParticipant.objects.bulk_create(participants, batch_size=batch_size)
+        categories = GoalCategory.objects.bulk_create(categories, batch_size=batch_size)
+    report(f'пользователей {len(users)}, досок {len(boards)}, участников {len(participants)}, '
+           f'категорий {len(categories)}')
+
+    statuses, status_weights = list(plan.status_weights), list(plan.status_weights.values())
+    priorities, priority_weights = list(plan.priority_weights), list(plan.priority_weights.values())
+
+    def due_date() -> datetime | None:
+        if rnd.random() >= plan.due_ratio:
+            return None
+        if rnd.random() < plan.overdue_ratio:
+            return now - timedelta(days=rnd.expovariate(1 / 15))
+        return now + timedelta(days=min(rnd.expovariate(3 / plan.due_horizon_days), plan.due_horizon_days))
+
+    # доска каждой цели в порядке вставки — для board_id комментариев
+    goal_boards = array('q')
+
+    def goal_rows() -> Iterator[dict]:
+        for index in range(plan.goals):
+            board_index = skewed_index(rnd, len(boards), plan.board_skew)
+            goal_boards.append(boards[board_index].id)
+            category = categories[board_index * plan.categories_per_board + rnd.randrange(plan.categories_per_board)]
+            created = created_at()
+            yield {
+                'title': f'Цель {index}',
+                'description': f'Описание цели {index}' if rnd.random() < 0.5 else None,
+                'user_id': rnd.choice(board_members[board_index]), 'category_id': category.id,
+                'board_id': category.board_id,
+                'status': rnd.choices(statuses, status_weights)[0],
+                'priority': rnd.choices(priorities, priority_weights)[0],
+                'due_date': due_date(), 'created': created, 'updated': created,
+            }
+
+    def progress(label: str) -> Callable[[int], None]:
+        return lambda count: report(f'{label} {count}') if count % (batch_size * 20) == 0 else None
+
+    goal_ids = array('q')
+    writer.write(Goal, goal_rows(), goal_ids, progress('целей'))
+
+    comments = int(plan.goals * plan.comments_per_goal)
+
+    def comment_rows() -> Iterator[dict]:
+        for index in range(comments):
+            created = created_at()
+            goal_index = skewed_index(rnd, len(goal_ids), plan.comment_skew)
+            yield {
+                'goal_id': goal_ids[goal_index], 'board_id': goal_boards[goal_index],
+                'user_id': rnd.choice(result.user_ids), 'text': f'Комментарий {index}',
+                'created': created, 'updated': created,
+            }
+
+    if goal_ids:
+        writer.write(GoalComment, comment_rows(), array('q'), progress('комментариев'))
+
+    # сигналы не отправлялись: сводку статистики досок строим по загруженным целям
+    stats.rebuild(result.board_ids)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    result.counts = {
+        'users': len(result.user_ids), 'boards': len(boards), 'participants': len(participants),
+        'categories': len(categories), 'goals': len(goal_ids), 'comments': comments if goal_ids else 0,
+    }
+    return result
@@ -1,8 +1,14 @@
-from rest_framework import serializers
+from collections import Counter, defaultdict
+
+from rest_framework import serializers, status
 from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
 from django.core.exceptions import PermissionDenied
 
 from core.models import User
+from goals import membership, response_cache, stats
+from goals.membership import get_membership
 from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
 from core.serializers import ProfileSerializer
 
@@ -21,11 +27,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
     def validate_board(self, value: Board):
         if value.is_deleted:
             raise serializers.ValidationError('Board is deleted')
-        if not BoardParticipant.objects.filter(
-                board=value,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user_id=self.context['request'].user.id
-        ):
+        if not get_membership(self.context['request']).can_write(value.id):
             raise PermissionDenied
         return value
 
@@ -45,17 +47,13 @@ class GoalCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Goal
         fields = '__all__'
-        read_only_fields = ("id", "user", "created", "updated")
+        read_only_fields = ("id", "user", "board", "created", "updated")
 
     def validate_category(self, value: GoalCategory):
         if value.is_deleted:
             raise serializers.ValidationError('Category is deleted')
 
-        if not BoardParticipant.objects.filter(
-                board=value.board.id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user_id=self.context['request'].user.id
-        ):
+        if not get_membership(self.context['request']).can_write(value.board_id):
             raise PermissionDenied
         return value
 
@@ -66,7 +64,7 @@ class GoalSerializer(serializers.ModelSerializer):
     class Meta:
         model = Goal
         fields = '__all__'
-        read_only_fields = ("id", "user", "created", "updated")
+        read_only_fields = ("id", "user", "board", "created", "updated")
 
 
 class GoalCommentCreateSerializer(serializers.ModelSerializer):
@@ -75,14 +73,10 @@ class GoalCommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = GoalComment
         fields = '__all__'
-        read_only_fields = ('id', 'user', 'created', 'updated')
+        read_only_fields = ('id', 'user', 'board', 'created', 'updated')
 
     def validate_goal(self, value: Goal):
-        if not BoardParticipant.objects.filter(
-                board=value.category.board.id,
-                user_id=self.context['request'].user.id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        ):
+        if not get_membership(self.context['request']).can_write(value.board_id):
             raise PermissionDenied
         return value
 
@@ -93,7 +87,7 @@ class GoalCommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = GoalComment
         fields = '__all__'
-        read_only_fields = ('id', 'created', 'updated', 'user', 'goal')
+        read_only_fields = ('id', 'created', 'updated', 'user', 'goal', 'board')
 
 
 class BoardListSerializer(serializers.ModelSerializer):
@@ -119,12 +113,21 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         return board
 
 
+class ParticipantUserField(serializers.SlugRelatedField):
+    """На входе возвращает username как есть: пользователи ищутся одним запросом в BoardSerializer."""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        return data
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     role = serializers.ChoiceField(
         required=True, choices=BoardParticipant.Role.choices[1:]
     )
 
-    user = serializers.SlugRelatedField(
+    user = ParticipantUserField(
         slug_field="username", queryset=User.objects.all()
     )
 
@@ -143,34 +146,188 @@ class BoardSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('id', 'created', 'updated')
 
+    def to_representation(self, instance: Board):
+        # после update DRF сбрасывает кеш prefetch — подгружаем участников с пользователями заново
+        prefetch_related_objects([instance], 'participants__user')
+        return super().to_representation(instance)
+
+    def validate_participants(self, value: list[dict]) -> list[dict]:
+        users = User.objects.in_bulk({part['user'] for part in value}, field_name='username')
+        for part in value:
+            if part['user'] not in users:
+                raise serializers.ValidationError(f'Object with username={part["user"]} does not exist.')
+            part['user'] = users[part['user']]
+        return value
+
     def update(self, instance, validated_data):
         owner: User = validated_data.pop('user')
-        new_participants = validated_data.pop('participants')
-        old_participants = instance.participants.exclude(user=owner)
-        new_by_id = {part['user'].id: part for part in new_participants}
+        new_roles = {
+            part['user'].id: part['role']
+            for part in validated_data.pop('participants')
+            if part['user'].id != owner.id
+        }
+        now = timezone.now()
         with transaction.atomic():
-            # определить и выкинуть тех, кого не будет в новом списке участников
-            for old_part in old_participants:
-                if old_part.user_id not in new_by_id.keys():
-                    old_part.delete()
-                # для всех, кто остался
-                else:
-                    # проверяем, изменилась ли роль -> изменяем
-                    if old_part.role != new_by_id[old_part.user_id]['role']:
-                        old_part.role = new_by_id[old_part.user_id]['role']
-                        old_part.save()
-                    # получаем обработанного старого участника и удаляем из словаря новых
-                    new_by_id.pop(old_part.user_id)
-            # для всех, кто остался в новых
-            for new_part in new_by_id.values():
-                BoardParticipant.objects.create(
-                    user=new_part['user'],
-                    board=instance,
-                    role=new_part['role']
-                )
-
-                if title := validated_data.get('title'):
-                    instance.title = title
-                    instance.save()
+            old_by_id = {part.user_id: part for part in instance.participants.exclude(user=owner)}
+            # тех, кого нет в новом списке, удаляем; у оставшихся обновляем роль; остальных добавляем
+            removed = [user_id for user_id in old_by_id if user_id not in new_roles]
+            changed = []
+            for user_id, role in new_roles.items():
+                if user_id in old_by_id and old_by_id[user_id].role != role:
+                    old_by_id[user_id].role = role
+                    old_by_id[user_id].updated = now
+                    changed.append(old_by_id[user_id])
+            added = [
+                BoardParticipant(board=instance, user_id=user_id, role=role, created=now, updated=now)
+                for user_id, role in new_roles.items() if user_id not in old_by_id
+            ]
+
+            if removed:
+                BoardParticipant.objects.filter(board=instance, user_id__in=removed).delete()
+            BoardParticipant.objects.bulk_update(changed, fields=('role', 'updated'))
+            BoardParticipant.objects.bulk_create(added)
+            # bulk_update и bulk_create не отправляют сигналы — сбрасываем кеш ролей и ответов сами;
+            # удалённых тоже, не полагаясь на post_delete: без получателей delete() сигналы не шлёт
+            membership.invalidate(*removed, *(part.user_id for part in changed + added))
+            response_cache.bump(instance.id)
+
+            if title := validated_data.get('title'):
+                instance.title = title
+                instance.save(update_fields=('title', 'updated'))
 
         return instance
+
+
+class GoalBulkOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=('create', 'update', 'archive'))
+    id = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=255, required=False)
+    description = serializers.CharField(allow_null=True, allow_blank=True, required=False)
+    category = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+    due_date = serializers.DateTimeField(allow_null=True, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if attrs['op'] == 'create':
+            for field in ('title', 'category'):
+                if field not in attrs:
+                    raise serializers.ValidationError({field: 'This field is required.'})
+        elif 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'This field is required.'})
+        return attrs
+
+
+class GoalImportRowSerializer(serializers.Serializer):
+    """Одна строка импорта; доступ к категории проверяет импортёр — один раз на категорию."""
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_null=True, allow_blank=True, required=False)
+    category = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+    due_date = serializers.DateTimeField(allow_null=True, required=False)
+
+
+class GoalBulkSerializer(serializers.Serializer):
+    """
+    Пакет операций над целями. Ошибка в одной операции не отменяет остальные:
+    результат возвращается для каждой операции отдельно, а все изменения
+    записываются одной транзакцией через bulk_create/bulk_update.
+    Каждая цель — не больше чем в одной операции пакета, повторы отклоняются.
+    """
+    operations = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=500)
+
+    def create(self, validated_data: dict) -> list[dict]:
+        request = self.context['request']
+        membership = get_membership(request)
+        results: list[dict | None] = [None] * len(validated_data['operations'])
+
+        operations: list[tuple[int, dict]] = []
+        for index, item in enumerate(validated_data['operations']):
+            operation = GoalBulkOperationSerializer(data=item)
+            if operation.is_valid():
+                operations.append((index, operation.validated_data))
+            else:
+                results[index] = {'status': status.HTTP_400_BAD_REQUEST, 'errors': operation.errors}
+
+        # операции над одной целью меняли бы один объект, и результат ранней показал бы итог поздней
+        id_counts = Counter(op['id'] for _, op in operations if 'id' in op)
+        for index, op in operations:
+            if id_counts[op.get('id')] > 1:
+                results[index] = {'status': status.HTTP_400_BAD_REQUEST,
+                                  'errors': {'id': ['Goal occurs more than once in the batch']}}
+        operations = [(index, op) for index, op in operations if results[index] is None]
+
+        readable_boards = list(membership.roles)
+        goals: dict[int, Goal] = Goal.objects.select_related('user').exclude(
+            status=Goal.Status.archived
+        ).filter(
+            category__is_deleted=False, board_id__in=readable_boards,
+            id__in={op['id'] for _, op in operations if 'id' in op},
+        ).in_bulk()
+        category_boards: dict[int, int] = dict(GoalCategory.objects.filter(
+            is_deleted=False, board_id__in=readable_boards,
+            id__in={op['category'] for _, op in operations if 'category' in op},
+        ).values_list('id', 'board_id'))
+
+        now = timezone.now()
+        created: list[tuple[int, Goal]] = []
+        updated: dict[int, Goal] = {}
+        update_fields: set[str] = set()
+        touched_boards: set[int] = set()
+        moved: dict[int, list[int]] = defaultdict(list)
+        for index, op in operations:
+            if 'category' in op and op['category'] not in category_boards:
+                results[index] = {'status': status.HTTP_400_BAD_REQUEST, 'errors': {'category': ['Category not found']}}
+                continue
+            goal = goals.get(op.get('id'))
+            if op['op'] != 'create' and goal is None:
+                results[index] = {'status': status.HTTP_404_NOT_FOUND, 'errors': {'id': ['Goal not found']}}
+                continue
+
+            boards = {category_boards[op['category']]} if 'category' in op else set()
+            if goal is not None:
+                boards.add(goal.board_id)
+            if not all(membership.can_write(board_id) for board_id in boards):
+                results[index] = {'status': status.HTTP_403_FORBIDDEN, 'errors': {'detail': 'Permission denied'}}
+                continue
+            touched_boards.update(boards)
+
+            fields = {key: value for key, value in op.items() if key not in ('op', 'id', 'category')}
+            if 'category' in op:
+                fields['category_id'] = op['category']
+                fields['board_id'] = category_boards[op['category']]
+            if op['op'] == 'create':
+                goal = Goal(user=request.user, created=now, updated=now, **fields)
+                created.append((index, goal))
+                results[index] = {'status': status.HTTP_201_CREATED, 'goal': goal}
+                continue
+            if op['op'] == 'archive':
+                fields = {'status': Goal.Status.archived}
+            if fields.get('board_id', goal.board_id) != goal.board_id:
+                moved[fields['board_id']].append(goal.id)
+            for key, value in fields.items():
+                setattr(goal, key, value)
+            goal.updated = now
+            update_fields.update(key.removesuffix('_id') for key in fields)
+            updated[goal.id] = goal
+            results[index] = {'status': status.HTTP_200_OK, 'goal': goal}
+
+        with transaction.atomic():
+            Goal.objects.bulk_create([goal for _, goal in created])
+            if updated:
+                Goal.objects.bulk_update(updated.values(), fields=[*update_fields, 'updated'])
+                # комментарии перенесённых на другую доску целей следуют за ними
+                for board_id, goal_ids in moved.items():
+                    GoalComment.objects.filter(goal_id__in=goal_ids).update(board_id=board_id)
+            # bulk-операции не отправляют сигналы
+            stats.apply(stats.diff([*(goal for _, goal in created), *updated.values()]))
+            response_cache.bump(*touched_boards)
+
+        for result in results:
+            if goal := result.pop('goal', None):
+                result['data'] = GoalSerializer(goal).data
+        return results
+
+    def to_representation(self, instance: list[dict]) -> dict:
+        return {'results': instance}
@@ -0,0 +1,120 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from core.models import User
+from goals import membership, response_cache, stats
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment, GoalStat
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def invalidate_board_roles(sender, instance: BoardParticipant, **kwargs):
+    membership.invalidate(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Board)
+@receiver([post_save, post_delete], sender=GoalCategory)
+@receiver([post_save, post_delete], sender=Goal)
+@receiver([post_save, post_delete], sender=GoalComment)
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def bump_board_generation(sender, instance, **kwargs):
+    response_cache.bump(board_id_of(instance))
+
+
+@receiver(post_save, sender=User)
+def bump_user_boards(sender, instance: User, created: bool, update_fields=None, **kwargs):
+    # профиль автора вложен в списки целей, категорий и комментариев; вход и смена пароля его не меняют
+    if created or not settings.RESPONSE_CACHE_TIMEOUT:
+        return
+    if update_fields and set(update_fields) <= {'last_login', 'password'}:
+        return
+    response_cache.bump(*user_board_ids(instance.id))
+
+
+@receiver(post_init, sender=Goal)
+def snapshot_goal_stat_key(sender, instance: Goal, **kwargs):
+    stats.snapshot(instance)
+
+
+@receiver(pre_save, sender=Goal)
+def load_goal_stat_key(sender, instance: Goal, **kwargs):
+    # цель создана не из базы (или с отложенными полями) — старый ключ берём запросом
+    if instance.pk is not None and '_stat_key' not in instance.__dict__:
+        old = Goal.objects.filter(pk=instance.pk).values_list('category_id', 'status', 'priority').first()
+        if old is not None:
+            instance._stat_key = old
+
+
+@receiver(pre_save, sender=Goal)
+def set_goal_board(sender, instance: Goal, **kwargs):
+    # _stat_key[0] — категория на момент загрузки: доску пересчитываем, только если категория сменилась
+    old = instance.__dict__.get('_stat_key')
+    instance._old_board_id = instance.board_id
+    if instance.board_id is None or old is None or old[0] != instance.category_id:
+        if Goal.category.is_cached(instance):
+            instance.board_id = instance.category.board_id
+        else:
+            instance.board_id = GoalCategory.objects.values_list('board_id', flat=True).get(pk=instance.category_id)
+
+
+@receiver(pre_save, sender=GoalComment)
+def set_comment_board(sender, instance: GoalComment, **kwargs):
+    if instance.board_id is None:
+        if GoalComment.goal.is_cached(instance):
+            instance.board_id = instance.goal.board_id
+        else:
+            instance.board_id = Goal.objects.values_list('board_id', flat=True).get(pk=instance.goal_id)
+
+
+@receiver(post_save, sender=Goal)
+def update_goal_stats(sender, instance: Goal, **kwargs):
+    stats.apply(stats.diff([instance]))
+
+
+@receiver(post_save, sender=Goal)
+def move_goal_comments(sender, instance: Goal, created: bool, **kwargs):
+    if not created and instance._old_board_id != instance.board_id:
+        GoalComment.objects.filter(goal=instance).update(board_id=instance.board_id)
+        response_cache.bump(instance._old_board_id)
+
+
+@receiver(pre_save, sender=GoalCategory)
+def load_category_board(sender, instance: GoalCategory, **kwargs):
+    # доска категории через API не меняется, но может быть изменена в админке
+    instance._old_board_id = None if instance.pk is None else (
+        GoalCategory.objects.filter(pk=instance.pk).values_list('board_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=GoalCategory)
+def move_category_goals(sender, instance: GoalCategory, created: bool, **kwargs):
+    old_board_id = instance._old_board_id
+    if created or old_board_id is None or old_board_id == instance.board_id:
+        return
+    # update() не отправляет сигналы: цели, комментарии и сводка переносятся вместе с категорией
+    Goal.objects.filter(category=instance).update(board_id=instance.board_id)
+    GoalComment.objects.filter(goal__category=instance).update(board_id=instance.board_id)
+    GoalStat.objects.filter(category=instance).update(board_id=instance.board_id)
+    response_cache.bump(old_board_id)
+
+
+@receiver(post_delete, sender=Goal)
+def remove_goal_stats(sender, instance: Goal, **kwargs):
+    stats.apply(Counter({instance.__dict__.get('_stat_key') or stats.stat_key(instance): -1}))
+
+
+def user_board_ids(user_id: int) -> set[int]:
+    """Доски, где пользователь участник или автор: его профиль может быть в их списках."""
+    return set(BoardParticipant.objects.filter(user_id=user_id).values_list('board_id', flat=True).union(
+        Goal.objects.filter(user_id=user_id).values_list('board_id', flat=True),
+        GoalCategory.objects.filter(user_id=user_id).values_list('board_id', flat=True),
+        GoalComment.objects.filter(user_id=user_id).values_list('board_id', flat=True),
+    ))
+
+
+def board_id_of(instance) -> int | None:
+    if isinstance(instance, Board):
+        return instance.pk
+    return instance.board_id
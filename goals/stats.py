@@ -0,0 +1,120 @@
+from collections import Counter
+from typing import Iterable
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from goals.models import Goal, GoalCategory, GoalStat
+
+# (category_id, status, priority)
+Key = tuple[int, int, int]
+
+ACTIVE_STATUSES = (Goal.Status.to_do, Goal.Status.in_progress)
+
+
+def stat_key(goal: Goal) -> Key:
+    return goal.category_id, goal.status, goal.priority
+
+
+def snapshot(goal: Goal) -> None:
+    """Запоминает ключ цели, какой он сейчас в базе; из __dict__, чтобы не загружать отложенные поля."""
+    values = goal.__dict__
+    if goal.pk is not None and all(name in values for name in ('category_id', 'status', 'priority')):
+        goal._stat_key = stat_key(goal)
+
+
+def diff(goals: Iterable[Goal]) -> Counter:
+    """Изменения сводки для сохранённых целей: -1 старому ключу, +1 новому; снимок обновляется."""
+    deltas = Counter()
+    for goal in goals:
+        old, new = goal.__dict__.get('_stat_key'), stat_key(goal)
+        if old != new:
+            if old is not None:
+                deltas[old] -= 1
+            deltas[new] += 1
+        goal._stat_key = new
+    return deltas
+
+
+def apply(deltas: Counter) -> None:
+    """Прибавляет изменения к сводке; вызывается в транзакции, которая меняет цели."""
+    missing = []
+    for (category_id, status, priority), delta in deltas.items():
+        if delta and not GoalStat.objects.filter(
+            category_id=category_id, status=status, priority=priority,
+        ).update(count=F('count') + delta) and delta > 0:
+            # вычитать из несуществующей строки нечего: её удалили вместе с категорией или доской
+            missing.append((category_id, status, priority, delta))
+    if not missing:
+        return
+
+    boards = dict(GoalCategory.objects.filter(id__in={key[0] for key in missing}).values_list('id', 'board_id'))
+    for category_id, status, priority, delta in missing:
+        try:
+            with transaction.atomic():
+                GoalStat.objects.create(board_id=boards[category_id], category_id=category_id,
+                                        status=status, priority=priority, count=delta)
+        except IntegrityError:
+            # строку успела создать параллельная транзакция
+            GoalStat.objects.filter(category_id=category_id, status=status, priority=priority).update(
+                count=F('count') + delta,
+            )
+
+
+def rebuild(board_ids: Iterable[int] | None = None) -> int:
+    """Пересчитывает сводку по целям (всю или по доскам) одним GROUP BY; возвращает число строк."""
+    goals = Goal.objects.all()
+    stats = GoalStat.objects.all()
+    if board_ids is not None:
+        board_ids = list(board_ids)
+        goals = goals.filter(board_id__in=board_ids)
+        stats = stats.filter(board_id__in=board_ids)
+    rows = goals.values('category_id', 'board_id', 'status', 'priority').annotate(
+        count=Count('id'),
+    ).order_by()
+    with transaction.atomic():
+        stats.delete()
+        created = GoalStat.objects.bulk_create([
+            GoalStat(board_id=row['board_id'], category_id=row['category_id'],
+                     status=row['status'], priority=row['priority'], count=row['count'])
+            for row in rows
+        ], batch_size=1000)
+    return len(created)
+
+
+def board_summary(board_id: int) -> dict:
+    """
+    Статистика доски из сводки: чтение O(категорий), а не O(целей).
+    by_status учитывает и архив, остальные счётчики — только неархивные цели.
+    Просрочка зависит от текущего времени, поэтому считается по частичному индексу целей.
+    """
+    categories = {
+        row['id']: {'id': row['id'], 'title': row['title'], 'total': 0,
+                    'by_status': dict.fromkeys(Goal.Status.names, 0)}
+        for row in GoalCategory.objects.filter(board_id=board_id, is_deleted=False).order_by('title', 'id')
+        .values('id', 'title')
+    }
+    by_status = dict.fromkeys(Goal.Status.names, 0)
+    by_priority = dict.fromkeys(Goal.Priority.names, 0)
+    for category_id, status, priority, count in GoalStat.objects.filter(
+        board_id=board_id, category_id__in=list(categories), count__gt=0,
+    ).values_list('category_id', 'status', 'priority', 'count'):
+        status_name = Goal.Status(status).name
+        by_status[status_name] += count
+        categories[category_id]['by_status'][status_name] += count
+        if status != Goal.Status.archived:
+            by_priority[Goal.Priority(priority).name] += count
+            categories[category_id]['total'] += count
+
+    overdue = Goal.objects.filter(
+        category_id__in=list(categories), status__in=ACTIVE_STATUSES, due_date__lt=timezone.now(),
+    ).count() if categories else 0
+    return {
+        'board': board_id,
+        'total': sum(category['total'] for category in categories.values()),
+        'overdue': overdue,
+        'by_status': by_status,
+        'by_priority': by_priority,
+        'categories': list(categories.values()),
+    }
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from goals.views import category, comment, goal, board
+from goals.views import category, comment, export, goal, board
 
 
 urlpatterns = [
@@ -10,13 +10,18 @@ urlpatterns = [
 
     path('goal/create', goal.GoalCreateView.as_view()),
     path('goal/list', goal.GoalListView.as_view()),
+    path('goal/bulk', goal.GoalBulkView.as_view()),
+    path('goal/import', goal.GoalImportView.as_view()),
     path('goal/<pk>', goal.GoalView.as_view()),
 
     path('goal_comment/create', comment.GoalCommentCreateView.as_view()),
     path('goal_comment/list', comment.GoalCommentListView.as_view()),
     path('goal_comment/<pk>', comment.GoalCommentView.as_view()),
 
+    path('export', export.ExportView.as_view(), name='export'),
+
     path('board/create', board.BoardCreateView.as_view(), name='create_board'),
     path('board/list', board.BoardListView.as_view(), name='board_list'),
+    path('board/<int:pk>/stats', board.BoardStatsView.as_view(), name='board_stats'),
     path('board/<pk>', board.BoardView.as_view(), name='retrieve_update_destroy_board'),
 ]
@@ -1,52 +1,70 @@
-from django.db import transaction
 from rest_framework import filters
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import RetrieveUpdateDestroyAPIView, ListAPIView, CreateAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from goals.models import Board, Goal
+from goals import membership, stats
+from goals.models import Board
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
 from goals.serializers import BoardSerializer, BoardCreateSerializer, BoardListSerializer
 from goals.permissions import BoardPermissions
+from goals.pagination import LimitOffsetOrKeysetPagination
+from goals.response_cache import CachedListMixin
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = Board
     permission_classes = [BoardPermissions, ]
     serializer_class = BoardSerializer
 
     def get_queryset(self):
-        return Board.objects.prefetch_related('participants').filter(
+        return Board.objects.prefetch_related('participants__user').filter(
             participants__user_id=self.request.user.id,
             is_deleted=False
         )
 
-    def perform_destroy(self, instance: Board):
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save(update_fields=('is_deleted',))
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(
-                status=Goal.Status.archived
-            )
+    def get_etag_parts(self, instance: Board) -> tuple:
+        # в ответе есть участники: учитываем их число и последнее изменение (уже загружены prefetch)
+        participants = instance.participants.all()
+        return instance.pk, instance.updated, len(participants), max((part.updated for part in participants), default=None)
 
+    def perform_destroy(self, instance: Board):
+        # Доска скрывается сразу, а категории и цели архивирует порциями
+        # команда archive_deleted_boards — без долгих блокировок в HTTP-запросе
+        instance.is_deleted = True
+        instance.save(update_fields=('is_deleted', 'updated'))
+        membership.invalidate(*instance.participants.values_list('user_id', flat=True))
         return instance
 
 
+class BoardStatsView(APIView):
+    """Счётчики целей доски по статусам, приоритетам и категориям и число просроченных."""
+    permission_classes = [IsAuthenticated, ]
+
+    def get(self, request, pk: int, *args, **kwargs):
+        if not membership.get_membership(request).can_read(pk):
+            raise NotFound
+        return Response(stats.board_summary(pk))
+
+
 class BoardCreateView(CreateAPIView):
     serializer_class = BoardCreateSerializer
     permission_classes = [IsAuthenticated, ]
 
 
-class BoardListView(ListAPIView):
+class BoardListView(ConditionalListMixin, CachedListMixin, ListAPIView):
     model = Board
     serializer_class = BoardListSerializer
     permission_classes = [BoardPermissions, ]
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
     filter_backends = [filters.OrderingFilter]
     ordering = ['title']
 
     def get_queryset(self):
-        return Board.objects.prefetch_related('participants').filter(
+        # BoardListSerializer не выводит участников — prefetch не нужен
+        return Board.objects.filter(
             participants__user_id=self.request.user.id,
             is_deleted=False
         )
@@ -1,12 +1,15 @@
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework.pagination import LimitOffsetPagination
 
 from goals.models import GoalCategory
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from goals.fast_serializers import ValuesListMixin
 from goals.serializers import GoalCategorySerializer, GoalCategoryCreateSerializer
 from goals.filters import CategoryBoardFilter
 from goals.permissions import CategoryPermissions
+from goals.pagination import LimitOffsetOrKeysetPagination
+from goals.response_cache import CachedListMixin
 
 
 class GoalCategoryCreateView(CreateAPIView):
@@ -15,11 +18,11 @@ class GoalCategoryCreateView(CreateAPIView):
     serializer_class = GoalCategoryCreateSerializer
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(ConditionalListMixin, CachedListMixin, ValuesListMixin, ListAPIView):
     model = GoalCategory
     serializer_class = GoalCategorySerializer
     permission_classes = [CategoryPermissions, ]
-    pagination_class = LimitOffsetPagination
+    pagination_class = LimitOffsetOrKeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = CategoryBoardFilter
     search_fields = ['title']
@@ -28,18 +31,18 @@ class GoalCategoryListView(ListAPIView):
 
     def get_queryset(self):
         return GoalCategory.objects.prefetch_related('board__participants').filter(
-            is_deleted=False, board__participants__user_id=self.request.user.id,
+            is_deleted=False, board__is_deleted=False, board__participants__user_id=self.request.user.id,
         )
 
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = GoalCategory
     serializer_class = GoalCategorySerializer
     permission_classes = [CategoryPermissions, ]
 
     def get_queryset(self):
         return GoalCategory.objects.select_related('user').filter(
-            is_deleted=False, board__participants__user_id=self.request.user.id,
+            is_deleted=False, board__is_deleted=False, board__participants__user_id=self.request.user.id,
         )
 
     def perform_destroy(self, instance):
@@ -3,9 +3,13 @@ from rest_framework import filters
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import IsAuthenticated
 
+from goals.membership import member_boards
 from goals.models import GoalComment
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from goals.fast_serializers import ValuesListMixin
 from goals.serializers import GoalCommentSerializer, GoalCommentCreateSerializer
 from goals.permissions import IsOwnerOrReadOnly
+from goals.pagination import LimitOffsetOrKeysetPagination
 
 
 class GoalCommentCreateView(CreateAPIView):
@@ -14,24 +18,23 @@ class GoalCommentCreateView(CreateAPIView):
     permission_classes = [IsAuthenticated, ]
 
 
-class GoalCommentListView(ListAPIView):
+class GoalCommentListView(ConditionalListMixin, ValuesListMixin, ListAPIView):
     model = GoalComment
     permission_classes = [IsAuthenticated, ]
     serializer_class = GoalCommentSerializer
+    pagination_class = LimitOffsetOrKeysetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['goal', ]
     ordering = ['-created', ]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(
-            goal__category__board__participants__user_id=self.request.user.id
-        )
+        return GoalComment.objects.filter(board_id__in=member_boards(self.request.user.id))
 
 
-class GoalCommentView(RetrieveUpdateDestroyAPIView):
+class GoalCommentView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = GoalComment
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly, ]
     serializer_class = GoalCommentSerializer
 
     def get_queryset(self):
-        return GoalComment.objects.filter(goal__category__board__participants__user_id=self.request.user.id)
+        return GoalComment.objects.filter(board_id__in=member_boards(self.request.user.id))
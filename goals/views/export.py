@@ -0,0 +1,72 @@
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from goals import export
+from goals.membership import BoardMembership
+
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson; charset=utf-8', 'csv': 'text/csv; charset=utf-8'}
+OBJECTS = ('all', 'goals', 'comments')
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """gzip допустим, если в Accept-Encoding он (или *) указан с q > 0; явное gzip;q=0 запрещает сжатие."""
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0))) > 0
+
+
+class ExportView(APIView):
+    """
+    Выгрузка всех целей (с категорией) и комментариев пользователя потоком:
+    ?output=ndjson|csv&objects=all|goals|comments. CSV — только для одного типа объектов.
+    Память не зависит от объёма: строки читаются серверным курсором и сразу уходят клиенту.
+    """
+    permission_classes = [IsAuthenticated, ]
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'ndjson')
+        objects = request.query_params.get('objects', 'all' if output == 'ndjson' else 'goals')
+        if output not in CONTENT_TYPES:
+            raise ValidationError({'output': f'Допустимые значения: {", ".join(CONTENT_TYPES)}'})
+        if objects not in OBJECTS or (output == 'csv' and objects == 'all'):
+            raise ValidationError({'objects': 'Для CSV укажите goals или comments'})
+
+        board_ids = BoardMembership(request.user.id).roles.keys()
+        sources = []
+        if objects in ('all', 'goals'):
+            sources.append(('goal', export.iter_rows(export.goals_queryset(board_ids), export.GOAL_COLUMNS)))
+        if objects in ('all', 'comments'):
+            sources.append(('comment', export.iter_rows(export.comments_queryset(board_ids), export.COMMENT_COLUMNS)))
+
+        if output == 'csv':
+            columns = export.GOAL_COLUMNS if objects == 'goals' else export.COMMENT_COLUMNS
+            stream = export.csv_stream(list(columns), sources[0][1])
+        else:
+            stream = export.ndjson_stream(sources)
+        stream = (chunk.encode() for chunk in stream)
+
+        gzip = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = StreamingHttpResponse(compress_sequence(stream) if gzip else stream,
+                                         content_type=CONTENT_TYPES[output])
+        if gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response['Content-Disposition'] = f'attachment; filename="{objects}.{output}"'
+        # nginx не должен копить поток в буфере
+        response['X-Accel-Buffering'] = 'no'
+        return response
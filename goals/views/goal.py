@@ -1,15 +1,24 @@
-from django.db.models import Q
+from django.conf import settings
 from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework import filters, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from goals.membership import member_boards
+from goals.importer import FORMATS, GoalImporter, detect_format, iter_records
 from goals.models import Goal
-from goals.serializers import GoalSerializer, GoalCreateSerializer
+from goals.conditional import ConditionalListMixin, ConditionalRetrieveMixin
+from goals.fast_serializers import ValuesListMixin
+from goals.serializers import GoalSerializer, GoalCreateSerializer, GoalBulkSerializer
 from goals.filters import GoalDateFilter
 from goals.permissions import GoalBoardPermissions
+from goals.pagination import LimitOffsetOrKeysetPagination
+from goals.search import GoalSearchFilter
+from goals.response_cache import CachedListMixin
 
 
 class GoalCreateView(CreateAPIView):
@@ -18,17 +27,55 @@ class GoalCreateView(CreateAPIView):
     serializer_class = GoalCreateSerializer
 
 
-class GoalView(RetrieveUpdateDestroyAPIView):
+class GoalBulkView(GenericAPIView):
+    permission_classes = [IsAuthenticated, ]
+    serializer_class = GoalBulkSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+
+class GoalImportView(GenericAPIView):
+    """
+    Импорт целей из файла (multipart, поле file) в формате CSV или NDJSON — по расширению
+    или ?input=csv|ndjson. Django сохраняет большой файл во временный, импорт читает его потоком.
+    Импорт, не уложившийся в GOAL_IMPORT_TIME_LIMIT, останавливается между порциями с complete=false:
+    записанное остаётся, а повтор с ?after_line=<last_line> продолжает со следующей строки.
+    """
+    permission_classes = [IsAuthenticated, ]
+    parser_classes = [MultiPartParser, ]
+
+    def post(self, request, *args, **kwargs):
+        file = request.FILES.get('file')
+        if file is None:
+            raise ValidationError({'file': 'This field is required.'})
+        input_format = request.query_params.get('input') or detect_format(file.name)
+        if input_format not in FORMATS:
+            raise ValidationError({'input': f'Допустимые значения: {", ".join(FORMATS)}'})
+        try:
+            after_line = int(request.query_params.get('after_line', 0))
+        except ValueError:
+            raise ValidationError({'after_line': 'Ожидается номер строки'})
+        importer = GoalImporter(request.user, batch_size=settings.GOAL_IMPORT_BATCH_SIZE,
+                                time_limit=settings.GOAL_IMPORT_TIME_LIMIT)
+        result = importer.run(iter_records(file.file, input_format), after_line=after_line)
+        # при ошибке базы порции до last_line записаны, остальное можно догрузить повтором
+        return Response(result.as_dict(),
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR if result.aborted else status.HTTP_200_OK)
+
+
+class GoalView(ConditionalRetrieveMixin, RetrieveUpdateDestroyAPIView):
     model = Goal
     permission_classes = [IsAuthenticated, GoalBoardPermissions, ]
     serializer_class = GoalSerializer
 
     def get_queryset(self):
-        return Goal.objects.select_related('category').filter(
-            ~Q(status=Goal.Status.archived) &
-            Q(category__is_deleted=False) &
-            Q(category__board__participants__user_id=self.request.user.id)
-        )
+        return Goal.objects.filter(
+            board_id__in=member_boards(self.request.user.id), category__is_deleted=False,
+        ).exclude(status=Goal.Status.archived)
 
     def perform_destroy(self, instance):
         with transaction.atomic():
@@ -37,20 +84,18 @@ class GoalView(RetrieveUpdateDestroyAPIView):
         return instance
 
 
-class GoalListView(ListAPIView):
+class GoalListView(ConditionalListMixin, CachedListMixin, ValuesListMixin, ListAPIView):
     model = Goal
     permission_classes = [IsAuthenticated, ]
     serializer_class = GoalSerializer
-    pagination_class = LimitOffsetPagination
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = LimitOffsetOrKeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, GoalSearchFilter]
     filterset_class = GoalDateFilter
     search_fields = ['title', 'description']
     ordering_fields = ['due_date']
     ordering = ['due_date', '-priority']
 
     def get_queryset(self):
-        return Goal.objects.select_related('category').filter(
-            ~Q(status=Goal.Status.archived) &
-            Q(category__is_deleted=False) &
-            Q(category__board__participants__user_id=self.request.user.id)
-        )
+        return Goal.objects.filter(
+            board_id__in=member_boards(self.request.user.id), category__is_deleted=False,
+        ).exclude(status=Goal.Status.archived)
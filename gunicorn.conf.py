@@ -0,0 +1,14 @@
+import os
+
+bind = '0.0.0.0:8000'
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+# gthread: запрос занимает поток, а не весь воркер. Главный поток воркера продолжает
+# отмечаться у мастера, поэтому долгая выгрузка (goals/export) или импорт не убиваются
+# по timeout, как у sync-воркеров; их длительность ограничивает proxy_read_timeout nginx
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+# timeout — только на зависший воркер
+timeout = 30
+# при перезапуске даём дописать ответы: столько же, сколько nginx ждёт импорт
+graceful_timeout = 600
+keepalive = 5
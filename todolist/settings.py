@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # первым: учитывает запросы и время всех остальных middleware
+    'core.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,6 +93,16 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+# locmem виден только своему процессу, dummy ничего не хранит: с ними общие кеши
+# ролей и ответов по умолчанию выключены (см. goals.checks)
+SHARED_CACHE = CACHES['default']['BACKEND'].rsplit('.', 1)[-1] not in ('LocMemCache', 'DummyCache')
+# Время жизни кеша ролей участников досок, сек; 0 — роли загружаются заново в каждом запросе
+MEMBERSHIP_CACHE_TIMEOUT = env.int('MEMBERSHIP_CACHE_TIMEOUT', default=60 * 5 if SHARED_CACHE else 0)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -138,8 +150,22 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'static/media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Время жизни закешированных ответов списков, сек; 0 — кеш выключен.
+# Поколения досок должны быть общими для всех процессов, поэтому нужен общий кеш
+RESPONSE_CACHE_TIMEOUT = env.int('RESPONSE_CACHE_TIMEOUT', default=60 * 5 if SHARED_CACHE else 0)
+
+# Сколько секунд goal/import пишет порции, прежде чем остановиться с complete=false;
+# меньше proxy_read_timeout импорта в nginx (600 с), чтобы клиент успел получить last_line
+GOAL_IMPORT_TIME_LIMIT = env.int('GOAL_IMPORT_TIME_LIMIT', default=540)
+# Строк в одной транзакции goal/import
+GOAL_IMPORT_BATCH_SIZE = env.int('GOAL_IMPORT_BATCH_SIZE', default=1000)
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 AUTH_USER_MODEL = 'core.User'
@@ -167,6 +193,18 @@ SOCIAL_AUTH_VK_EXTRA_DATA = [
 SOCIAL_AUTH_USER_MODEL = 'core.User'
 
 BOT_TOKEN = env('BOT_TOKEN')
+# Алиас из CACHES для общего состояния диалогов бота; пусто — хранить в памяти процесса
+BOT_STATE_CACHE = env.str('BOT_STATE_CACHE', default='default' if SHARED_CACHE else '')
+BOT_STATE_TTL = env.int('BOT_STATE_TTL', default=60 * 30)
+# Алиас из CACHES для общего предела отправки (30 сообщений/с на бота) во всех процессах;
+# пусто — у каждого процесса свой предел
+BOT_RATE_LIMIT_CACHE = env.str('BOT_RATE_LIMIT_CACHE', default='default' if SHARED_CACHE else '')
+# Алиас из CACHES для привязанных аккаунтов Telegram: сброс после изменения TgUser виден всем процессам;
+# пусто — LRU в памяти процесса, изменения из API доходят до бота не позже чем через минуту
+BOT_IDENTITY_CACHE = env.str('BOT_IDENTITY_CACHE', default='default' if SHARED_CACHE else '')
+# Webhook: пустой секрет — приём отключён, runbot работает через long polling;
+# с секретом webhook сохраняет обновления в базу, а runbot их обрабатывает (см. bot.checks)
+BOT_WEBHOOK_SECRET = env.str('BOT_WEBHOOK_SECRET', default='')
 
 LOGGING = {
     'version': 1,
@@ -180,4 +218,10 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'WARNING',
     },
+    'loggers': {
+        # строка на запрос от core.timing.ServerTimingMiddleware; поля — в extra записи лога
+        'todolist.requests': {
+            'level': env.str('REQUEST_LOG_LEVEL', default='INFO'),
+        },
+    },
 }
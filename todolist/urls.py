@@ -16,7 +16,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
-from bot.views import BotVerificationView
+from bot.views import BotVerificationView, BotWebhookView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -24,5 +24,6 @@ urlpatterns = [
     path('goals/', include('goals.urls')),
     path('oauth/', include('social_django.urls', namespace='social')),
     path('bot/verify', BotVerificationView.as_view(), name='telegram_verify'),
+    path('bot/webhook', BotWebhookView.as_view(), name='telegram_webhook'),
 
 ]